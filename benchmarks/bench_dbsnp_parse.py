@@ -0,0 +1,87 @@
+# dbSNP 페이지 파싱 시간 비교: 기존 방식(html.parser 로 두 번 파싱) vs parse_dbsnp_page (한 번, lxml)
+#
+#   python benchmarks/bench_dbsnp_parse.py               # 합성 페이지 사용
+#   python benchmarks/bench_dbsnp_parse.py --page rs10833.html
+import argparse
+import os
+import sys
+from timeit import repeat
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import nayoung_ori  # noqa: E402
+
+POPULATIONS = ["Total", "European", "African", "African Others", "African American", "Asian",
+               "East Asian", "Other Asian", "Latin American 1", "Latin American 2", "South Asian", "Other"]
+
+
+# 실제 dbSNP 페이지처럼 내비게이션/스크립트/다른 표가 많고, 그 사이에 빈도 표가 하나 있는 HTML
+def make_synthetic_page(rsid="rs10833", filler_tables=40, filler_divs=400):
+    parts = ["<html><head><title>dbSNP</title>"]
+    parts += [f"<script>var x{i} = {i};</script>" for i in range(50)]
+    parts.append("</head><body>")
+    parts.append(f'<div class="summary-box"><a href="/snp/{rsid}">{rsid}</a> Current Build 156</div>')
+    parts += [f'<div class="nav"><span>menu {i}</span><a href="/help/{i}">help {i}</a></div>' for i in range(filler_divs)]
+    for t in range(filler_tables):
+        rows = "".join(f"<tr><td>cell {t}-{r}-1</td><td>cell {t}-{r}-2</td><td>cell {t}-{r}-3</td></tr>" for r in range(10))
+        parts.append(f"<table><thead><tr><th>Col A</th><th>Col B</th><th>Col C</th></tr></thead><tbody>{rows}</tbody></table>")
+    rows = "".join(
+        f"<tr><td>ALFA</td><td>{pop}</td><td>Sub</td><td>{1000 + i * 37}</td>"
+        f"<td>A=0.{i:02d}5</td><td>G=0.{99 - i:02d}5</td></tr>"
+        for i, pop in enumerate(POPULATIONS)
+    )
+    parts.append("<table><thead><tr><th>Study</th><th>Population</th><th>Group</th><th>Sample Size</th>"
+                 f"<th>Ref Allele</th><th>Alt Allele</th></tr></thead><tbody>{rows}</tbody></table>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# 변경 전 코드와 같은 작업량: 병합 확인용 1회 + 빈도 표 추출용 1회, 모든 표의 헤더를 읽음
+def legacy_parse(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    link = soup.find('a', href=True, string=lambda s: s and s.lower().startswith('rs'))
+    if link:
+        'merged into' in link.find_parent('div').text.lower()
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for table in soup.find_all('table'):
+        rows = table.find_all('tr')
+        if not rows:
+            continue
+        headers = [cell.text.strip().upper() for cell in rows[0].find_all(['th', 'td'])]
+        if 'REF ALLELE' in headers and 'ALT ALLELE' in headers:
+            for row in rows[1:]:
+                [td.text.strip() for td in row.find_all('td')]
+
+
+def bench(name, func, html, number, repeats):
+    best = min(repeat(lambda: func(html), number=number, repeat=repeats)) / number
+    print(f"{name:<32} {best * 1000:8.2f} ms/page")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="dbSNP 페이지 파싱 벤치마크")
+    parser.add_argument('--page', help="저장해 둔 dbSNP HTML 파일 (없으면 합성 페이지)")
+    parser.add_argument('--number', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, encoding='utf-8') as f:
+            html = f.read()
+    else:
+        html = make_synthetic_page()
+    print(f"페이지 크기: {len(html) / 1024:.1f} KB")
+
+    assert nayoung_ori._parse_dbsnp_page_bs4(html) == nayoung_ori.parse_dbsnp_page(html)
+
+    legacy = bench("기존 (html.parser x2)", legacy_parse, html, args.number, args.repeat)
+    bs4_once = bench("parse_dbsnp_page (bs4 x1)", nayoung_ori._parse_dbsnp_page_bs4, html, args.number, args.repeat)
+    if nayoung_ori.lxml is not None:
+        fast = bench("parse_dbsnp_page (lxml x1)", nayoung_ori._parse_dbsnp_page_lxml, html, args.number, args.repeat)
+        print(f"속도 향상: {legacy / fast:.1f}x")
+    else:
+        print("lxml 이 설치되어 있지 않아 bs4 경로만 측정")
+        print(f"속도 향상: {legacy / bs4_once:.1f}x")
@@ -0,0 +1,125 @@
+# 네트워크 없이 스텁 서버(stub_server.py)와 녹화된 응답으로 전체 파이프라인을 측정
+#   1) process_rsids 처리량 (rsID/초)
+#   2) dbSNP 페이지 한 장당 파싱 + 행 생성 시간
+#   3) 표 생성 + 저장 시간 (save_outputs 와 같은 경로)
+#
+#   python benchmarks/bench_offline.py --synthetic 500 --latency 0.05 --ensembl-rate 15 --dbsnp-rate 3
+#   python benchmarks/bench_offline.py --error-rate 0.05    # 429/5xx 재시도 경로 포함
+import argparse
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+from urllib.parse import urlparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import nayoung_ori  # noqa: E402
+from stub_server import FIXTURES_DIR, FixtureStore, StubServer  # noqa: E402
+
+
+def fixture_rsids():
+    with open(os.path.join(FIXTURES_DIR, 'manifest.json'), encoding='utf-8') as f:
+        return list(json.load(f))
+
+
+def bench_pipeline(rsids, ensembl, dbsnp, workers, ensembl_rate, dbsnp_rate):
+    nayoung_ori.configure_cache(None)
+    nayoung_ori.configure_alias_index(None)
+    rate_limits = {
+        urlparse(ensembl.url).netloc: ensembl_rate,
+        urlparse(dbsnp.url).netloc: dbsnp_rate,
+    }
+    metrics = nayoung_ori.reset_metrics()
+    start = perf_counter()
+    data, errors = nayoung_ori.process_rsids(rsids, max_workers=workers, rate_limits=rate_limits)
+    elapsed = perf_counter() - start
+    print(f"파이프라인     {len(rsids):,} rsID  {elapsed:8.2f} s  → {len(rsids) / elapsed:8.1f} rsID/s  "
+          f"({len(data):,} 행, 오류 {len(errors)}건)")
+    for name, server in (("Ensembl", ensembl), ("dbSNP", dbsnp)):
+        counts = server.counts
+        print(f"  {name:<8} 요청 {counts['requests']:,}  429 {counts['rate_limited']:,}  "
+              f"주입 오류 {counts['injected_errors']:,}")
+    # 작업 스레드 안의 단계(dbsnp_fetch, parse)는 스레드 시간 합계라 전체 시간보다 클 수 있음
+    for name, stage in metrics.report()['stages'].items():
+        print(f"  {name:<17} {stage['seconds']:8.2f} s  ({stage['count']:,}회)")
+    return data, errors
+
+
+def bench_parse(rsids, repeat):
+    # 응답은 메모리 캐시에 넣어두고 파싱 + 행 생성 비용만 잼 (fetch_dbsnp_page 는 매번 다시 파싱)
+    nayoung_ori.configure_cache(':memory:')
+    pages = []
+    for rsid in rsids:
+        if nayoung_ori.fetch_dbsnp_page(rsid).status_code == 200:
+            pages.append(rsid)
+    if not pages:
+        print("파싱           측정할 페이지 없음")
+        return
+
+    start = perf_counter()
+    for _ in range(repeat):
+        for rsid in pages:
+            nayoung_ori.get_frequency_from_dbsnp(rsid, "", [])
+    per_page = (perf_counter() - start) / (repeat * len(pages))
+    print(f"파싱           {len(pages)} 페이지 × {repeat}회  → 페이지당 {per_page * 1000:8.2f} ms")
+
+
+def _as_text(table):
+    # 엑셀에서는 빈 문자열과 NaN 이 모두 빈 칸이 되므로 둘 다 '' 로 맞춰서 비교
+    table = table.astype(object)
+    return table.where(table.notna() & (table != ''), '').astype(str).reset_index(drop=True)
+
+
+# xlsx 를 다시 읽어서 시트마다 원래 표와 같은지 확인
+def check_excel(tables, path):
+    for sheet, table in tables.items():
+        if len(table) >= nayoung_ori.EXCEL_MAX_ROWS:
+            continue
+        read_back = pd.read_excel(path, sheet_name=sheet)
+        expected = _as_text(table)
+        expected.columns = [str(column) for column in expected.columns]
+        if read_back.shape != table.shape or not _as_text(read_back).equals(expected):
+            raise Exception(f"{path} 의 {sheet} 시트가 원래 표와 다름")
+
+
+def bench_export(data, errors, formats):
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = perf_counter()
+        tables = nayoung_ori.build_output_tables(data, errors)
+        written = nayoung_ori.write_tables(tables, formats, output_dir)
+        elapsed = perf_counter() - start
+        for path in written:
+            if path.endswith('.xlsx'):
+                check_excel(tables, path)
+    checked = ", xlsx 검증 완료" if any(path.endswith('.xlsx') for path in written) else ""
+    print(f"저장           {len(data):,} 행 → {', '.join(formats)}  {elapsed:8.2f} s  ({len(written)}개 파일{checked})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스텁 서버를 이용한 오프라인 파이프라인 벤치마크")
+    parser.add_argument('--synthetic', type=int, default=200, help="추가로 만들 rsSYN<번호> ID 수")
+    parser.add_argument('--workers', type=int, default=nayoung_ori.MAX_WORKERS)
+    parser.add_argument('--latency', type=float, default=0.0, help="스텁 응답마다 추가할 지연 (초)")
+    parser.add_argument('--ensembl-rate', type=float, default=1000, help="클라이언트 Ensembl 초당 요청 수")
+    parser.add_argument('--dbsnp-rate', type=float, default=1000, help="클라이언트 dbSNP 초당 요청 수")
+    parser.add_argument('--server-rate', type=float, help="스텁 서버 초당 허용 요청 수 (넘으면 429)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="스텁이 500/503 을 돌려줄 비율")
+    parser.add_argument('--parse-repeat', type=int, default=50)
+    parser.add_argument('--formats', default="xlsx,csv", help=f"저장 형식 ({','.join(nayoung_ori.OUTPUT_FORMATS)})")
+    args = parser.parse_args()
+
+    nayoung_ori.QUIET = True
+    rsids = fixture_rsids() + [f"rsSYN{i}" for i in range(args.synthetic)]
+    store = FixtureStore(synthesize=True)
+    options = dict(latency=args.latency, rate_limit=args.server_rate, error_rate=args.error_rate)
+
+    with StubServer(store, **options) as ensembl, StubServer(store, **options) as dbsnp:
+        nayoung_ori.ENSEMBL_URL = ensembl.url
+        nayoung_ori.DBSNP_URL = f"{dbsnp.url}/snp"
+
+        data, errors = bench_pipeline(rsids, ensembl, dbsnp, args.workers, args.ensembl_rate, args.dbsnp_rate)
+        bench_parse(fixture_rsids(), args.parse_repeat)
+    bench_export(data, errors, [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()])
@@ -0,0 +1,114 @@
+# build_population_summaries 벤치마크: 합성 데이터 (기본 100k rsID x 30 population)
+# FrequencyRecords 에서 DataFrame 변환까지 포함해서 측정 (save_outputs 와 같은 입력)
+#
+#   python benchmarks/bench_population_summary.py
+#   python benchmarks/bench_population_summary.py --rsids 2000 --populations 30 --legacy
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import nayoung_ori  # noqa: E402
+
+
+# (rsID, population) 마다 REF 1행 + ALT 1~2행, process_rsids 결과와 같은 열 구성
+# 반복되는 문자열 열은 categorical 로 둠 (object 열로도 동작하지만 변환 시간이 더 듦)
+def make_synthetic_frame(n_rsids, n_populations, seed=0):
+    rng = np.random.default_rng(seed)
+    rsids = np.array([f"rs{i}" for i in range(1, n_rsids + 1)], dtype=object)
+    populations = np.array([f"Population {i}" for i in range(n_populations)], dtype=object)
+    bases = np.array(['A', 'C', 'G', 'T'], dtype=object)
+
+    n_groups = n_rsids * n_populations
+    group_rsid = np.repeat(rsids, n_populations)
+    group_pop = np.tile(populations, n_rsids)
+    ref_freq = rng.random(n_groups)
+    sample_size = rng.integers(100, 100000, n_groups).astype(str)
+    second_alt = rng.random(n_groups) < 0.2
+
+    ref = pd.DataFrame({
+        'rsID': group_rsid, 'population': group_pop, 'allele': 'A', 'allele_type': 'REF',
+        'frequency': ref_freq, 'allele_number': sample_size,
+    })
+    alt = pd.DataFrame({
+        'rsID': group_rsid, 'population': group_pop, 'allele': 'G', 'allele_type': 'ALT',
+        'frequency': 1 - ref_freq, 'allele_number': sample_size,
+    })
+    alt2 = pd.DataFrame({
+        'rsID': group_rsid[second_alt], 'population': group_pop[second_alt],
+        'allele': bases[rng.integers(1, 4, second_alt.sum())], 'allele_type': 'ALT',
+        'frequency': 0.0, 'allele_number': sample_size[second_alt],
+    })
+    df = pd.concat([ref, alt, alt2], ignore_index=True)
+    df['merged_from'] = ''
+    df['alt_alleles'] = 'G'
+    df['is_in_ensembl'] = True
+    for column in ['rsID', 'population', 'allele', 'allele_type', 'allele_number', 'alt_alleles']:
+        df[column] = df[column].astype('category')
+    return df[nayoung_ori.FREQUENCY_COLUMNS]
+
+
+# save_outputs 가 받는 것과 같은 FrequencyRecords 로 변환
+# (행마다 add() 를 부르면 수백만 행에서 너무 오래 걸리므로 categorical 코드로 배열을 바로 채움)
+def make_synthetic_records(df):
+    records = nayoung_ori.FrequencyRecords()
+    for column in nayoung_ori._CODED_COLUMNS:
+        values = df[column].astype('category')
+        records.values[column] = list(values.cat.categories)
+        records.lookup[column] = {value: code for code, value in enumerate(records.values[column])}
+        records.codes[column].frombytes(values.cat.codes.to_numpy(dtype=np.int32).tobytes())
+    records.frequency.frombytes(df['frequency'].to_numpy(dtype=np.float64).tobytes())
+    records.is_in_ensembl.frombytes(df['is_in_ensembl'].to_numpy(dtype=np.int8).tobytes())
+    return records
+
+
+# 변경 전 구현 (그룹마다 Python 루프) — 작은 데이터에서만 비교용으로 실행
+def legacy_summarize_by_population(df):
+    df = df.astype({'rsID': object, 'population': object, 'allele_type': object})
+    df['frequency'] = pd.to_numeric(df['frequency'], errors='coerce')
+    df['allele_number'] = pd.to_numeric(df['allele_number'], errors='coerce')
+    summary_rows = []
+    for (rsid, population), group in df.groupby(['rsID', 'population']):
+        row = {'rsID': rsid, 'population': population, 'sample_size': None}
+        ref_row = group[group['allele_type'] == 'REF']
+        alt_row = group[group['allele_type'] == 'ALT']
+        if not ref_row.empty:
+            row['REF_allele'] = ref_row.iloc[0]['allele']
+            row['REF_freq'] = ref_row.iloc[0]['frequency']
+            row['sample_size'] = ref_row.iloc[0]['allele_number']
+        if not alt_row.empty:
+            row['ALT_allele'] = alt_row.iloc[0]['allele']
+            row['ALT_freq'] = alt_row.iloc[0]['frequency']
+        summary_rows.append(row)
+    return pd.DataFrame(summary_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="population 요약 벤치마크")
+    parser.add_argument('--rsids', type=int, default=100000)
+    parser.add_argument('--populations', type=int, default=30)
+    parser.add_argument('--legacy', action='store_true', help="변경 전 루프 구현도 측정 (느림)")
+    args = parser.parse_args()
+
+    df = make_synthetic_frame(args.rsids, args.populations)
+    records = make_synthetic_records(df)
+    print(f"입력: {args.rsids} rsID x {args.populations} population = {len(records):,} 행 (FrequencyRecords)")
+
+    # save_outputs 와 같은 경로: FrequencyRecords → DataFrame → long + wide
+    start = perf_counter()
+    frame = nayoung_ori.to_frame(records)
+    converted = perf_counter()
+    long, wide = nayoung_ori.build_population_summaries(frame)
+    elapsed = perf_counter() - start
+    print(f"to_frame: {converted - start:.2f} s, build_population_summaries: {elapsed - (converted - start):.2f} s")
+    print(f"합계: {elapsed:.2f} s  (long {long.shape}, wide {wide.shape}, 목표 1 s "
+          f"{'달성' if elapsed < 1 else '초과'})")
+
+    if args.legacy:
+        start = perf_counter()
+        legacy_summarize_by_population(df)
+        print(f"기존 summarize_by_population (long 만): {perf_counter() - start:.2f} s")
@@ -0,0 +1,65 @@
+# allele 행 저장 방식별 최대 메모리 비교: 기존 dict 목록 vs FrequencyRecords
+#
+#   python benchmarks/bench_record_memory.py --rsids 20000 --populations 12
+import argparse
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import nayoung_ori  # noqa: E402
+
+
+# HTML 파싱 결과처럼 행마다 새 문자열 객체가 만들어지도록 f-string 으로 생성
+def iter_rows(n_rsids, n_populations):
+    for i in range(n_rsids):
+        rsid = f"rs{1000000 + i}"
+        for p in range(n_populations):
+            population = f"Population {p}"
+            allele_number = f"{1000 + p * 7}"
+            yield rsid, population, f"{'A'}", "REF", 0.5, allele_number, f"{'G'},{'T'}", True
+            yield rsid, population, f"{'G'}", "ALT", 0.3, allele_number, f"{'G'},{'T'}", True
+            yield rsid, population, f"{'T'}", "ALT", 0.2, allele_number, f"{'G'},{'T'}", True
+
+
+def build_dicts(n_rsids, n_populations):
+    rows = []
+    for rsid, population, allele, allele_type, frequency, allele_number, alt_str, in_ensembl in iter_rows(n_rsids, n_populations):
+        rows.append({
+            'rsID': rsid, 'merged_from': '', 'population': population, 'allele': allele,
+            'allele_type': allele_type, 'frequency': frequency, 'allele_number': allele_number,
+            'alt_alleles': alt_str, 'is_in_ensembl': in_ensembl,
+        })
+    return rows
+
+
+def build_records(n_rsids, n_populations):
+    records = nayoung_ori.FrequencyRecords()
+    for rsid, population, allele, allele_type, frequency, allele_number, alt_str, in_ensembl in iter_rows(n_rsids, n_populations):
+        records.add(rsid, rsid, population, allele, allele_type, frequency, allele_number, alt_str, in_ensembl)
+    return records
+
+
+def measure(name, build, to_frame, n_rsids, n_populations):
+    tracemalloc.start()
+    data = build(n_rsids, n_populations)
+    held, peak_build = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    df = to_frame(data)
+    _, peak_frame = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mb = 1024 ** 2
+    print(f"{name:<20} 보관 {held / mb:8.1f} MB   생성 최대 {peak_build / mb:8.1f} MB   "
+          f"DataFrame 변환 포함 최대 {peak_frame / mb:8.1f} MB   ({len(df):,} 행)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="allele 행 저장 방식별 메모리 벤치마크")
+    parser.add_argument('--rsids', type=int, default=20000)
+    parser.add_argument('--populations', type=int, default=12)
+    args = parser.parse_args()
+
+    measure("dict 목록 (기존)", build_dicts, pd.DataFrame, args.rsids, args.populations)
+    measure("FrequencyRecords", build_records, nayoung_ori.to_frame, args.rsids, args.populations)
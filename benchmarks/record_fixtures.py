@@ -0,0 +1,55 @@
+# 실제 Ensembl / dbSNP 서버에서 응답을 받아 benchmarks/fixtures 에 다시 녹화
+# (manifest.json 에 있는 rsID 기준, 응답이 200 이 아니면 파일을 만들지 않음 → 스텁에서도 400/404)
+#
+#   python benchmarks/record_fixtures.py
+#   python benchmarks/record_fixtures.py rs10833 rs982204 --note "새로 추가한 예시"
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import nayoung_ori  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+MANIFEST_PATH = os.path.join(FIXTURES_DIR, 'manifest.json')
+
+
+def record(rsid):
+    saved = []
+    response = nayoung_ori.http_get(nayoung_ori._ensembl_variation_url(rsid))
+    if response.status_code == 200:
+        path = os.path.join(FIXTURES_DIR, 'ensembl', f"{rsid}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(response.json(), f, indent=1, ensure_ascii=False)
+        saved.append(path)
+
+    response = nayoung_ori.http_get(f"{nayoung_ori.DBSNP_URL}/{rsid}", headers={'User-Agent': 'Mozilla/5.0'})
+    if response.status_code == 200:
+        path = os.path.join(FIXTURES_DIR, 'dbsnp', f"{rsid}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        saved.append(path)
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 응답 녹화")
+    parser.add_argument('rsids', nargs='*', help="녹화할 rsID (생략하면 manifest.json 전체)")
+    parser.add_argument('--note', default="", help="새 rsID 를 manifest.json 에 추가할 때 붙일 설명")
+    args = parser.parse_args()
+
+    with open(MANIFEST_PATH, encoding='utf-8') as f:
+        manifest = json.load(f)
+    rsids = args.rsids or list(manifest)
+
+    # 녹화는 항상 실제 서버에서 받아야 하므로 캐시를 쓰지 않음
+    nayoung_ori.configure_cache(None)
+    for rsid in rsids:
+        saved = record(rsid)
+        print(f"📼 {rsid}: {', '.join(os.path.relpath(p, FIXTURES_DIR) for p in saved) or '응답 없음'}")
+        manifest.setdefault(rsid, args.note)
+
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+        f.write("\n")
@@ -0,0 +1,196 @@
+# 녹화해 둔 Ensembl JSON / dbSNP HTML 을 돌려주는 로컬 HTTP 스텁 서버
+#
+#   GET  /variation/human/<rsid>   → fixtures/ensembl/<rsid>.json (없으면 400)
+#   POST /variation/human          → {"ids": [...]} 중 응답 파일이 있는 ID만 모아서 반환
+#   GET  /snp/<rsid>               → fixtures/dbsnp/<rsid>.html (없으면 404)
+#
+# latency(초), rate_limit(초당 요청 수, 넘으면 429), error_rate(500/503 비율)로 실제 서버 조건을 흉내냄.
+# synthesize=True 면 응답 파일이 없는 rsSYN<번호> ID는 template_rsid 응답을 복제해서 돌려줌 (처리량 측정용)
+#
+#   python benchmarks/stub_server.py --port 8800 --latency 0.05 --rate-limit 15
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from nayoung_ori import TokenBucket  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class FixtureStore:
+    def __init__(self, fixtures_dir=FIXTURES_DIR, synthesize=False, template_rsid="rs10833"):
+        self.ensembl = {}
+        self.dbsnp = {}
+        for name in os.listdir(os.path.join(fixtures_dir, 'ensembl')):
+            with open(os.path.join(fixtures_dir, 'ensembl', name), encoding='utf-8') as f:
+                self.ensembl[name[:-len('.json')]] = f.read()
+        for name in os.listdir(os.path.join(fixtures_dir, 'dbsnp')):
+            with open(os.path.join(fixtures_dir, 'dbsnp', name), encoding='utf-8') as f:
+                self.dbsnp[name[:-len('.html')]] = f.read()
+        self.synthesize = synthesize
+        self.template_rsid = template_rsid
+
+    def _lookup(self, table, rsid):
+        if rsid in table:
+            return table[rsid]
+        if self.synthesize and re.fullmatch(r'rsSYN\d+', rsid) and self.template_rsid in table:
+            return table[self.template_rsid].replace(self.template_rsid, rsid)
+        return None
+
+    def ensembl_record(self, rsid):
+        body = self._lookup(self.ensembl, rsid)
+        return json.loads(body) if body is not None else None
+
+    def dbsnp_page(self, rsid):
+        return self._lookup(self.dbsnp, rsid)
+
+
+class StubServer:
+    def __init__(self, store=None, host="127.0.0.1", port=0, latency=0.0, rate_limit=None,
+                 error_rate=0.0, seed=0):
+        self.store = store or FixtureStore()
+        self.latency = latency
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.counts = {'requests': 0, 'rate_limited': 0, 'injected_errors': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # 요청 하나에 대해 (지연, 429, 오류 주입) 을 적용하고 보낼 상태 코드를 정함 (None 이면 정상 처리)
+    def _admit(self):
+        with self.random_lock:
+            self.counts['requests'] += 1
+            inject = self.error_rate and self.random.random() < self.error_rate
+        if self.latency:
+            sleep(self.latency)
+        if self.bucket is not None and not self._try_take():
+            with self.random_lock:
+                self.counts['rate_limited'] += 1
+            return 429
+        if inject:
+            with self.random_lock:
+                self.counts['injected_errors'] += 1
+            return self.random.choice([500, 503])
+        return None
+
+    # TokenBucket.acquire 와 같은 계산이지만, 토큰이 없으면 기다리지 않고 바로 False
+    def _try_take(self):
+        bucket = self.bucket
+        with bucket.lock:
+            now = monotonic()
+            bucket.tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return True
+            return False
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type, headers=None):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _reject(self, status):
+                headers = {'Retry-After': '0.2'} if status == 429 else None
+                self._send(status, json.dumps({'error': f"stub {status}"}), 'application/json', headers)
+
+            def do_GET(self):
+                status = server._admit()
+                if status is not None:
+                    return self._reject(status)
+                path = self.path.split('?', 1)[0]
+                match = re.fullmatch(r'/variation/human/([^/]+)', path)
+                if match:
+                    record = server.store.ensembl_record(match.group(1))
+                    if record is None:
+                        body = json.dumps({'error': f"No variant found with ID '{match.group(1)}'"})
+                        return self._send(400, body, 'application/json')
+                    return self._send(200, json.dumps(record), 'application/json')
+                match = re.fullmatch(r'/snp/([^/]+)', path)
+                if match:
+                    page = server.store.dbsnp_page(match.group(1))
+                    if page is None:
+                        return self._send(404, "<html><body>Not Found</body></html>", 'text/html')
+                    return self._send(200, page, 'text/html; charset=utf-8')
+                self._send(404, "not found", 'text/plain')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = self.rfile.read(length)
+                status = server._admit()
+                if status is not None:
+                    return self._reject(status)
+                if self.path.split('?', 1)[0] != '/variation/human':
+                    return self._send(404, "not found", 'text/plain')
+                ids = json.loads(payload or b'{}').get('ids', [])
+                records = {}
+                for rsid in ids:
+                    record = server.store.ensembl_record(rsid)
+                    if record is not None:
+                        records[rsid] = record
+                self._send(200, json.dumps(records), 'application/json')
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ensembl/dbSNP 응답 스텁 서버")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.0, help="응답마다 추가할 지연 (초)")
+    parser.add_argument('--rate-limit', type=float, help="초당 허용 요청 수 (넘으면 429)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500/503 을 돌려줄 비율 (0~1)")
+    parser.add_argument('--synthesize', action='store_true', help="rsSYN<번호> ID 응답을 템플릿으로 생성")
+    args = parser.parse_args()
+
+    server = StubServer(FixtureStore(synthesize=args.synthesize), args.host, args.port,
+                        args.latency, args.rate_limit, args.error_rate)
+    print(f"🧪 스텁 서버 실행 중: {server.url}  (ENSEMBL_URL / DBSNP_URL={server.url}/snp 로 지정)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,74 +1,837 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import importlib.util
+import mmap
+import os
+import json
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager
 import requests
 from bs4 import BeautifulSoup
+import numpy as np
 import pandas as pd
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from time import sleep, monotonic, time
+from urllib.parse import urlparse
+
+try:
+    import lxml.html
+except ImportError:  # lxml 이 없으면 BeautifulSoup(html.parser) 로 파싱
+    lxml = None
+
+# STEP 0: HTTP 요청 설정 (호스트별 초당 요청 수 제한 + 동시 처리 개수)
+ENSEMBL_URL = "https://rest.ensembl.org"
+DBSNP_URL = "https://www.ncbi.nlm.nih.gov/snp"
+
+RATE_LIMITS = {
+    'rest.ensembl.org': 15,
+    'www.ncbi.nlm.nih.gov': 3,
+}
+DEFAULT_RATE_LIMIT = 3
+MAX_WORKERS = 8
+ENSEMBL_BATCH_SIZE = 200  # POST /variation/human 한 번에 보낼 수 있는 최대 ID 수
+HTTP_RETRIES = 3           # 429 / 5xx 응답, 연결 실패, 시간 초과면 다시 시도하는 횟수
+RETRY_STATUS = {429, 500, 502, 503, 504}
+HTTP_TIMEOUT = (10, 60)    # (연결, 응답 읽기) 제한 시간 (초) — 멈춘 연결 하나가 전체 실행을 막지 않도록
+RETRY_AFTER_MAX = 60       # Retry-After 가 이보다 길어도 이만큼만 대기 (초)
+
+# 응답 캐시 설정 (dbSNP/Ensembl 릴리스가 바뀔 때만 내용이 바뀌므로 디스크에 보관)
+CACHE_PATH = "snp_cache.sqlite"
+CACHE_TTL = 30 * 24 * 3600        # 초
+CACHE_MAX_BYTES = 1024 ** 3       # 1 GB 넘으면 오래 안 쓴 항목부터 삭제
+CACHE_TOUCH_BATCH = 500           # 캐시 적중 시각은 이만큼 모였을 때 (또는 저장할 때) 한 번에 기록
+
+# rsID 병합 별칭 인덱스 (옛 ID → 새 ID), 실행 사이에 유지
+ALIAS_INDEX_PATH = "rsid_aliases.sqlite"
+
+# 실행 지표: HTTP 응답 시간 히스토그램 구간 (초, Prometheus histogram 의 le 값)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUIET = False  # True 면 rsID / 테이블마다 찍는 진행 메시지를 생략
+
+
+def log(message):
+    if not QUIET:
+        print(message)
+
+
+# 단계별 소요 시간 + 호스트별 HTTP 통계
+# 스레드 안에서 도는 단계(dbsnp_fetch, parse)는 작업 스레드들의 시간을 합산한 값
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time()
+        self.stages = {}   # 단계 → [횟수, 초]
+        self.hosts = {}    # 호스트 → 통계 dict
+
+    @contextmanager
+    def stage(self, name):
+        start = monotonic()
+        try:
+            yield
+        finally:
+            elapsed = monotonic() - start
+            with self.lock:
+                entry = self.stages.setdefault(name, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def _host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {
+                'requests': 0, 'cache_hits': 0, 'retries': 0, 'redirects': 0,
+                'rate_limit_wait_seconds': 0.0, 'latency_seconds': 0.0,
+                'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1), 'status': {},
+            }
+        return self.hosts[host]
+
+    def record_cache_hit(self, host):
+        with self.lock:
+            self._host(host)['cache_hits'] += 1
+
+    def record_wait(self, host, seconds):
+        with self.lock:
+            self._host(host)['rate_limit_wait_seconds'] += seconds
+
+    def record_request(self, host, status, seconds, redirects=0, retry=False):
+        with self.lock:
+            stats = self._host(host)
+            stats['requests'] += 1
+            stats['retries'] += int(retry)
+            stats['redirects'] += redirects
+            stats['latency_seconds'] += seconds
+            stats['status'][status] = stats['status'].get(status, 0) + 1
+            bucket = next((i for i, le in enumerate(LATENCY_BUCKETS) if seconds <= le), len(LATENCY_BUCKETS))
+            stats['latency_buckets'][bucket] += 1
+
+    def report(self):
+        with self.lock:
+            hosts = {}
+            for host, stats in self.hosts.items():
+                # 상태 코드(int) 와 연결 오류 이름(str) 이 섞여 있으므로 문자열 기준 정렬
+                stats = dict(stats, status=dict(sorted((str(k), v) for k, v in stats['status'].items())))
+                counts = stats.pop('latency_buckets')
+                stats['latency_histogram'] = {
+                    str(le): n for le, n in zip(list(LATENCY_BUCKETS) + ['+Inf'], counts)
+                }
+                hosts[host] = stats
+            return {
+                'started': self.started,
+                'elapsed_seconds': time() - self.started,
+                'stages': {name: {'count': n, 'seconds': sec} for name, (n, sec) in self.stages.items()},
+                'hosts': hosts,
+            }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+    # node_exporter textfile collector 형식
+    def write_prometheus(self, path):
+        report = self.report()
+        lines = [
+            "# TYPE snp_search_elapsed_seconds gauge",
+            f"snp_search_elapsed_seconds {report['elapsed_seconds']:.6f}",
+            "# TYPE snp_search_stage_seconds counter",
+        ]
+        for name, stage in report['stages'].items():
+            lines.append(f'snp_search_stage_seconds{{stage="{name}"}} {stage["seconds"]:.6f}')
+        lines.append("# TYPE snp_search_stage_runs counter")
+        for name, stage in report['stages'].items():
+            lines.append(f'snp_search_stage_runs{{stage="{name}"}} {stage["count"]}')
+
+        for key in ('requests', 'cache_hits', 'retries', 'redirects', 'rate_limit_wait_seconds'):
+            lines.append(f"# TYPE snp_search_http_{key} counter")
+            for host, stats in report['hosts'].items():
+                lines.append(f'snp_search_http_{key}{{host="{host}"}} {stats[key]}')
+        lines.append("# TYPE snp_search_http_responses counter")
+        for host, stats in report['hosts'].items():
+            for status, n in stats['status'].items():
+                lines.append(f'snp_search_http_responses{{host="{host}",status="{status}"}} {n}')
+        lines.append("# TYPE snp_search_http_latency_seconds histogram")
+        for host, stats in report['hosts'].items():
+            cumulative = 0
+            for le, n in stats['latency_histogram'].items():
+                cumulative += n
+                lines.append(f'snp_search_http_latency_seconds_bucket{{host="{host}",le="{le}"}} {cumulative}')
+            lines.append(f'snp_search_http_latency_seconds_sum{{host="{host}"}} {stats["latency_seconds"]:.6f}')
+            lines.append(f'snp_search_http_latency_seconds_count{{host="{host}"}} {stats["requests"]}')
+
+        # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    # 경로 확장자가 .prom 이면 Prometheus 형식, 나머지는 JSON
+    def write(self, path):
+        if path.endswith('.prom'):
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+
+
+metrics = Metrics()
+
+
+def reset_metrics():
+    global metrics
+    metrics = Metrics()
+    return metrics
+
+
+# 함수 전체를 한 단계로 측정 (호출할 때의 metrics 에 기록)
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 호스트 하나당 token bucket 하나: 초당 rate 개의 토큰이 채워지고 요청마다 1개씩 사용
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_thread_local = threading.local()
+
+
+def configure_rate_limits(limits):
+    with _limiters_lock:
+        RATE_LIMITS.update(limits)
+        _limiters.clear()
+
+
+def get_rate_limiter(host):
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+        return _limiters[host]
+
+
+# 스레드마다 Session을 따로 두고 연결을 재사용
+def _get_session():
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+# 캐시에서 꺼낸 응답: requests.Response 에서 쓰는 속성만 흉내냄
+class CachedResponse:
+    def __init__(self, status_code, content, headers):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+# 요청(메서드 + URL + 본문)의 sha256 을 키로 쓰는 SQLite 응답 캐시
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB, "
+            "size INTEGER, created REAL, accessed REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.touched = {}  # 아직 DB 에 반영하지 않은 마지막 사용 시각 (key → time)
+
+    @staticmethod
+    def make_key(method, url, body=None):
+        raw = f"{method} {url}\n".encode('utf-8')
+        if body is not None:
+            raw += json.dumps(body, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, key, ignore_ttl=False):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, headers, body, created = row
+            if not ignore_ttl and self.ttl is not None and time() - created > self.ttl:
+                return None
+            # 조회할 때마다 commit 하면 요청마다 디스크 동기화가 일어나므로 모아서 반영
+            self.touched[key] = time()
+            if len(self.touched) >= CACHE_TOUCH_BATCH:
+                self._flush_touched()
+                self.conn.commit()
+        return CachedResponse(status, body, json.loads(headers))
+
+    def put(self, key, url, status, body, headers=None):
+        headers = {k: v for k, v in (headers or {}).items() if k.lower() in ('content-type', 'location')}
+        now = time()
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, len(body), now, now),
+            )
+            self.total_bytes += len(body)
+            self.touched.pop(key, None)
+            if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+                self._evict()
+            self._flush_touched()
+            self.conn.commit()
+
+    def _flush_touched(self):
+        if self.touched:
+            self.conn.executemany("UPDATE responses SET accessed = ? WHERE key = ?",
+                                  [(accessed, key) for key, accessed in self.touched.items()])
+            self.touched.clear()
+
+    def _evict(self):
+        # 오래 안 쓴 항목부터 max_bytes 의 90% 아래로 내려갈 때까지 삭제
+        target = self.max_bytes * 0.9
+        self._flush_touched()
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.total_bytes -= size
+
+    def close(self):
+        with self.lock:
+            self._flush_touched()
+            self.conn.commit()
+            self.conn.close()
+
+
+_cache = None
+OFFLINE = False
+
+
+def configure_cache(path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, offline=False):
+    global _cache, OFFLINE
+    if _cache is not None:
+        _cache.close()
+    _cache = ResponseCache(path, ttl, max_bytes) if path else None
+    OFFLINE = offline
+
+
+def cache_lookup(method, url, body=None):
+    if _cache is None:
+        return None
+    return _cache.get(ResponseCache.make_key(method, url, body), ignore_ttl=OFFLINE)
+
+
+# 캐시에서 찾으면 해당 호스트의 cache hit 으로 집계 (직접 cache_lookup 하는 곳도 이걸 거치도록)
+def cached_response(method, url, body=None):
+    cached = cache_lookup(method, url, body)
+    if cached is not None:
+        metrics.record_cache_hit(urlparse(url).netloc)
+    return cached
+
+
+def cache_store(method, url, status, content, headers=None, body=None):
+    if _cache is not None and status == 200:
+        _cache.put(ResponseCache.make_key(method, url, body), url, status, content, headers)
+
+
+# cache=False 면 캐시를 보지도, 저장하지도 않음 (호출하는 쪽에서 따로 캐시하는 경우)
+def _request(method, url, cache=True, **kwargs):
+    host = urlparse(url).netloc
+    cached = cached_response(method, url, kwargs.get('json')) if cache else None
+    if cached is not None:
+        return cached
+    if OFFLINE:
+        raise Exception(f"오프라인 모드: 캐시에 없는 요청 {method} {url}")
+
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    limiter = get_rate_limiter(host)
+    for attempt in range(HTTP_RETRIES + 1):
+        start = monotonic()
+        limiter.acquire()
+        sent = monotonic()
+        metrics.record_wait(host, sent - start)
+        backoff = 0.5 * 2 ** attempt  # 0.5, 1, 2초 ... 로 늘려가며 대기
+        try:
+            response = _get_session().request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.record_request(host, type(e).__name__, monotonic() - sent, retry=attempt > 0)
+            if attempt == HTTP_RETRIES:
+                raise
+            sleep(backoff)
+            continue
+        metrics.record_request(host, response.status_code, monotonic() - sent,
+                               redirects=len(response.history), retry=attempt > 0)
+        if response.status_code not in RETRY_STATUS or attempt == HTTP_RETRIES:
+            break
+        # Retry-After 가 있으면 따르되 RETRY_AFTER_MAX 를 넘지 않게, 없으면 backoff
+        try:
+            delay = min(max(float(response.headers.get('Retry-After', '')), 0), RETRY_AFTER_MAX)
+        except ValueError:
+            delay = backoff
+        sleep(delay)
+    if cache:
+        cache_store(method, url, response.status_code, response.content, response.headers, kwargs.get('json'))
+    return response
+
+
+def http_get(url, cache=True, **kwargs):
+    return _request('GET', url, cache=cache, **kwargs)
+
+
+def http_post(url, cache=True, **kwargs):
+    return _request('POST', url, cache=cache, **kwargs)
+
+
+# STEP 0.1: rsID 병합 별칭 인덱스 (옛 ID → 새 ID)
+# Ensembl/dbSNP 에서 발견한 병합과 dbSNP RsMergeArch 덤프를 SQLite 에 저장해두고,
+# 이미 아는 ID는 네트워크 없이 현재 ID까지 따라감
+class MergeAliasIndex:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS aliases (old TEXT PRIMARY KEY, new TEXT, source TEXT)")
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+
+    def __contains__(self, rsid):
+        return self.get(rsid) is not None
+
+    def get(self, rsid):
+        with self.lock:
+            row = self.conn.execute("SELECT new FROM aliases WHERE old = ?", (rsid,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, old, new, source=''):
+        if old == new:
+            return
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)", (old, new, source))
+            self.conn.commit()
+
+    # 반환값: (현재 ID, [원래 ID, ..., 현재 ID]); 순환이 있으면 예외
+    def resolve(self, rsid):
+        chain = [rsid]
+        while True:
+            new = self.get(chain[-1])
+            if new is None:
+                return chain[-1], chain
+            if new in chain:
+                raise Exception(f"[{rsid}] 병합 ID 순환: {' → '.join(chain + [new])}")
+            chain.append(new)
+
+    # dbSNP RsMergeArch.bcp(.gz) 불러오기: rsHigh, rsLow, ..., rsCurrent(7번째 열)
+    def load_rsmergearch(self, path, batch_size=100000):
+        opener = gzip.open if path.endswith('.gz') else open
+        count = 0
+        batch = []
+        with opener(path, 'rt') as f:
+            for line in f:
+                cols = line.rstrip('\n').split('\t')
+                if len(cols) < 2 or not cols[0].isdigit():
+                    continue
+                current = cols[6] if len(cols) > 6 and cols[6].isdigit() else cols[1]
+                if cols[0] != current:
+                    batch.append((f"rs{cols[0]}", f"rs{current}", 'RsMergeArch'))
+                if len(batch) >= batch_size:
+                    count += self._insert_many(batch)
+                    batch = []
+        count += self._insert_many(batch)
+        return count
+
+    def _insert_many(self, rows):
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)", rows)
+            self.conn.commit()
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_alias_index = MergeAliasIndex()
+
+
+def configure_alias_index(path=ALIAS_INDEX_PATH):
+    global _alias_index
+    _alias_index.close()
+    _alias_index = MergeAliasIndex(path or ":memory:")
+    return _alias_index
+
 
 # STEP 1: Ensembl API를 사용해서 REF/ALT allele 가져오기 (멀티 ALT 처리 포함)
+def _pick_ref_alt(data):
+    # GRCh38 매핑을 먼저 보고, 없으면 GRCh37 사용
+    for assembly in ['GRCh38', 'GRCh37']:
+        for mapping in data.get('mappings', []):
+            if mapping['assembly_name'] == assembly:
+                alleles = mapping['allele_string'].split('/')
+                if len(alleles) >= 2:
+                    ref = alleles[0].upper()
+                    alts = [a.upper() for a in alleles[1:]]
+                    return ref, alts
+    return None
+
+
+def _ensembl_variation_url(rsid):
+    return f"{ENSEMBL_URL}/variation/human/{rsid}?content-type=application/json"
+
+
+# 단건 조회도 일괄 조회와 같은 경로 (병합 추적 / 캐시 / 별칭 인덱스 공유)
 def get_ref_alt_from_ensembl(rsid):
-    url = f"https://rest.ensembl.org/variation/human/{rsid}?content-type=application/json"
-    response = requests.get(url)
-    if response.status_code != 200:
-        redirect_url = response.headers.get('location')
-        if redirect_url and 'rs' in redirect_url:
-            merged_rsid = redirect_url.split('/')[-1]
-            print(f"🔁 [{rsid}] → 발견 ID: {merged_rsid}")
-            return get_ref_alt_from_ensembl(merged_rsid)
-        raise Exception(f"[{rsid}] Ensembl API 요청 실패: {response.status_code}")
-
-    data = response.json()
-    if 'merged' in data and data['merged']:
-        merged_into = data['merged'][0]['id']
-        print(f"🔁 [{rsid}] → 발견 ID: {merged_into}")
-        return get_ref_alt_from_ensembl(merged_into)
-
-    for mapping in data.get('mappings', []):
-        if mapping['assembly_name'] in ['GRCh38', 'GRCh37']:
-            alleles = mapping['allele_string'].split('/')
-            if len(alleles) >= 2:
-                ref = alleles[0].upper()
-                alts = [a.upper() for a in alleles[1:]]
-                return ref, alts, rsid
-
-    raise Exception(f"[{rsid}] GRCh38 또는 GRCh37 기반의 REF/ALT 정보를 찾을 수 없음")
+    results, errors = get_ref_alt_from_ensembl_batch([rsid])
+    if errors:
+        raise Exception(errors[0]['error'])
+    return results[rsid]
 
-# STEP 2.1: 발견 ID 추적 (dbSNP 기준)
-def resolve_merged_rsid_from_dbsnp(rsid):
-    url = f"https://www.ncbi.nlm.nih.gov/snp/{rsid}"
+
+# STEP 1.1: Ensembl POST /variation/human 으로 여러 rsID를 한 번에 조회
+# 반환값: ({rsid: (ref, alts, 최종 rsid)}, [{'rsID': rsid, 'error': 메시지}])
+def get_ref_alt_from_ensembl_batch(rsid_list):
+    url = f"{ENSEMBL_URL}/variation/human"
+    headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+
+    resolved = {}   # 조회한 ID → (ref, alts, 조회한 ID)
+    failures = {}   # 조회한 ID 또는 원래 ID → 오류 메시지
+    # 병합 인덱스에 이미 있는 ID는 현재 ID로 바로 조회
+    pending = []
+    for rsid in dict.fromkeys(rsid_list):
+        try:
+            pending.append(_alias_index.resolve(rsid)[0])
+        except Exception as e:
+            failures[rsid] = str(e)
+    pending = list(dict.fromkeys(pending))
+    seen = set(pending)
+
+    while pending:
+        next_pending = []
+        for start in range(0, len(pending), ENSEMBL_BATCH_SIZE):
+            chunk = pending[start:start + ENSEMBL_BATCH_SIZE]
+            # 캐시는 ID별 단건 조회 URL 기준으로 저장 → 목록이 달라져도 재사용 가능
+            records = {}
+            for rsid in chunk:
+                cached = cached_response('GET', _ensembl_variation_url(rsid))
+                if cached is not None:
+                    records[rsid] = cached.json()
+            missing = [rsid for rsid in chunk if rsid not in records]
+            if missing:
+                try:
+                    if OFFLINE:
+                        raise Exception("오프라인 모드: 캐시에 없음")
+                    # 응답은 아래에서 ID별로 나눠 저장하므로 POST 응답 전체는 캐시하지 않음
+                    response = http_post(url, cache=False, headers=headers, json={'ids': missing})
+                    if response.status_code != 200:
+                        raise Exception(f"Ensembl API 요청 실패: {response.status_code}")
+                    fetched = response.json()
+                except Exception as e:
+                    for rsid in missing:
+                        failures[rsid] = f"[{rsid}] {e}"
+                    fetched = {}
+                for rsid, data in fetched.items():
+                    cache_store('GET', _ensembl_variation_url(rsid), 200, json.dumps(data).encode('utf-8'))
+                records.update(fetched)
+
+            for rsid in chunk:
+                if rsid in failures:
+                    continue
+                data = records.get(rsid)
+                if not data:
+                    failures[rsid] = f"[{rsid}] Ensembl API 요청 실패: 결과 없음"
+                    continue
+
+                if 'merged' in data and data['merged']:
+                    merged_into = data['merged'][0]['id']
+                    log(f"🔁 [{rsid}] → 발견 ID: {merged_into}")
+                    _alias_index.add(rsid, merged_into, 'ensembl')
+                    if merged_into not in seen:
+                        seen.add(merged_into)
+                        next_pending.append(merged_into)
+                    continue
+
+                ref_alt = _pick_ref_alt(data)
+                if ref_alt:
+                    resolved[rsid] = (ref_alt[0], ref_alt[1], rsid)
+                else:
+                    failures[rsid] = f"[{rsid}] GRCh38 또는 GRCh37 기반의 REF/ALT 정보를 찾을 수 없음"
+        pending = next_pending
+
+    results = {}
+    errors = []
+    for original in dict.fromkeys(rsid_list):
+        if original in failures:
+            errors.append({'rsID': original, 'error': failures[original]})
+            continue
+        try:
+            rsid = _alias_index.resolve(original)[0]
+        except Exception as e:
+            errors.append({'rsID': original, 'error': str(e)})
+            continue
+        if rsid in resolved:
+            results[original] = resolved[rsid]
+        else:
+            errors.append({'rsID': original, 'error': failures.get(rsid, f"[{rsid}] Ensembl API 요청 실패: 결과 없음")})
+    return results, errors
+
+# STEP 2.0: dbSNP 페이지는 rsID당 한 번만 받아서 병합 정보 + 빈도 표만 뽑아둠
+class DbsnpPage:
+    def __init__(self, rsid, status_code, merged_into=None, frequency_tables=None):
+        self.rsid = rsid
+        self.status_code = status_code
+        self.merged_into = merged_into
+        # [(헤더 목록, [각 행의 td 텍스트 목록, ...]), ...] — REF/ALT ALLELE 헤더가 있는 표만
+        self.frequency_tables = frequency_tables or []
+
+
+def _parse_dbsnp_page_lxml(html):
+    root = lxml.html.fromstring(html)
+
+    merged_into = None
+    for link in root.iterfind('.//a[@href]'):
+        if len(link) or not link.text or not link.text.lower().startswith('rs'):
+            continue
+        parent = next(link.iterancestors('div'), None)
+        if parent is not None and 'merged into' in parent.text_content().lower():
+            merged_into = link.text.strip()
+        break
+
+    tables = []
+    for table in root.iterfind('.//table'):
+        rows = table.findall('.//tr')
+        if not rows:
+            continue
+        headers = [cell.text_content().strip().upper() for cell in rows[0].xpath('.//th|.//td')]
+        if 'REF ALLELE' in headers and 'ALT ALLELE' in headers:
+            body = [[td.text_content().strip() for td in row.iterfind('.//td')] for row in rows[1:]]
+            tables.append((headers, body))
+    return merged_into, tables
+
+
+def _parse_dbsnp_page_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    merged_into = None
+    link = soup.find('a', href=True, string=lambda s: s and s.lower().startswith('rs'))
+    if link and 'merged into' in link.find_parent('div').text.lower():
+        merged_into = link.text.strip()
+
+    tables = []
+    for table in soup.find_all('table'):
+        rows = table.find_all('tr')
+        if not rows:
+            continue
+        headers = [cell.text.strip().upper() for cell in rows[0].find_all(['th', 'td'])]
+        if 'REF ALLELE' in headers and 'ALT ALLELE' in headers:
+            body = [[td.text.strip() for td in row.find_all('td')] for row in rows[1:]]
+            tables.append((headers, body))
+    return merged_into, tables
+
+
+def parse_dbsnp_page(html):
+    if lxml is not None:
+        return _parse_dbsnp_page_lxml(html)
+    return _parse_dbsnp_page_bs4(html)
+
+
+def fetch_dbsnp_page(rsid):
+    url = f"{DBSNP_URL}/{rsid}"
     headers = {'User-Agent': 'Mozilla/5.0'}
-    response = requests.get(url, headers=headers)
+    with metrics.stage('dbsnp_fetch'):
+        response = http_get(url, headers=headers)
     if response.status_code != 200:
+        return DbsnpPage(rsid, response.status_code)
+    with metrics.stage('parse'):
+        merged_into, tables = parse_dbsnp_page(response.text)
+    return DbsnpPage(rsid, response.status_code, merged_into, tables)
+
+
+# STEP 2.1: 발견 ID 추적 (dbSNP 기준)
+# pages 를 주면 받아온 페이지를 pages[rsid] 에 넣어둠 → 빈도 수집 때 다시 받지 않고 사용
+def resolve_merged_rsid_from_dbsnp(rsid, pages=None):
+    # 병합 인덱스에 있으면 페이지를 받지 않고 바로 현재 ID 반환
+    if rsid in _alias_index:
+        return _alias_index.resolve(rsid)[0]
+
+    page = fetch_dbsnp_page(rsid)
+    if pages is not None and page.status_code == 200 and not page.merged_into:
+        pages[rsid] = page
+    if page.status_code != 200:
         return rsid
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    link = soup.find('a', href=True, string=lambda s: s and s.lower().startswith('rs'))
-    if link and 'merged into' in link.find_parent('div').text.lower():
-        merged_id = link.text.strip()
-        print(f"🔁 [dbSNP] {rsid} → 발견 ID: {merged_id}")
-        return merged_id
+    if page.merged_into:
+        log(f"🔁 [dbSNP] {rsid} → 발견 ID: {page.merged_into}")
+        _alias_index.add(rsid, page.merged_into, 'dbsnp')
+        return page.merged_into
     return rsid
 
 # STEP 2.2: dbSNP ALT allele 모두 저장 + Ensembl 포함 여부 표시
-def get_frequency_from_dbsnp(rsid, ref, alt_list, original_rsid=None):
-    url = f"https://www.ncbi.nlm.nih.gov/snp/{rsid}"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"[{rsid}] dbSNP 페이지 요청 실패: {response.status_code}")
+FREQUENCY_COLUMNS = ['rsID', 'merged_from', 'population', 'allele', 'allele_type',
+                     'frequency', 'allele_number', 'alt_alleles', 'is_in_ensembl']
+_CODED_COLUMNS = ['rsID', 'merged_from', 'population', 'allele', 'allele_type', 'allele_number', 'alt_alleles']
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    tables = soup.find_all('table')
 
-    results = []
-    alt_str = ",".join(alt_list)
+# allele 행 저장소: 행마다 dict 를 만드는 대신 열 단위 배열에 저장
+# 반복되는 문자열 열(rsID, population, allele ...)은 열별 사전에 한 번만 넣고 정수 코드만 보관
+# to_dataframe() 은 배열 버퍼를 그대로 numpy/categorical 로 넘김
+class FrequencyRecords:
+    def __init__(self):
+        self.values = {column: [] for column in _CODED_COLUMNS}   # 코드 → 문자열
+        self.lookup = {column: {} for column in _CODED_COLUMNS}   # 문자열 → 코드
+        self.codes = {column: array('i') for column in _CODED_COLUMNS}
+        self.frequency = array('d')
+        self.is_in_ensembl = array('b')
+        self.exported = False  # to_dataframe() 이 배열 버퍼를 넘겨준 상태인지
 
-    for table in tables:
-        rows = table.find_all('tr')
-        if not rows:
-            continue
+    def __len__(self):
+        return len(self.frequency)
+
+    def _code(self, column, value):
+        lookup = self.lookup[column]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.values[column])
+            self.values[column].append(value)
+        return code
+
+    # 내보낸 버퍼가 있는 array 는 크기를 바꿀 수 없으므로, 내보낸 뒤 처음 추가할 때 복사본으로 교체
+    # (이미 만든 DataFrame 은 예전 배열을 그대로 보고 있어서 이후 추가와 섞이지 않음)
+    def _detach(self):
+        self.codes = {column: array('i', codes) for column, codes in self.codes.items()}
+        self.frequency = array('d', self.frequency)
+        self.is_in_ensembl = array('b', self.is_in_ensembl)
+        self.exported = False
+
+    def add(self, rsid, original_rsid, population, allele, allele_type, frequency,
+            allele_number, alt_str, is_in_ensembl):
+        if self.exported:
+            self._detach()
+        row = {
+            'rsID': original_rsid or rsid,
+            'merged_from': rsid if original_rsid and original_rsid != rsid else '',
+            'population': population,
+            'allele': allele,
+            'allele_type': allele_type,
+            'allele_number': allele_number,
+            'alt_alleles': alt_str,
+        }
+        for column, value in row.items():
+            self.codes[column].append(self._code(column, value))
+        self.frequency.append(float('nan') if frequency is None else frequency)
+        self.is_in_ensembl.append(bool(is_in_ensembl))
+
+    def extend(self, other):
+        if self.exported:
+            self._detach()
+        for column in _CODED_COLUMNS:
+            remap = [self._code(column, value) for value in other.values[column]]
+            self.codes[column].extend(remap[code] for code in other.codes[column])
+        self.frequency.extend(other.frequency)
+        self.is_in_ensembl.extend(other.is_in_ensembl)
+
+    def row(self, i):
+        row = {column: self.values[column][self.codes[column][i]] for column in _CODED_COLUMNS}
+        frequency = self.frequency[i]
+        row['frequency'] = None if frequency != frequency else frequency
+        row['is_in_ensembl'] = bool(self.is_in_ensembl[i])
+        return {column: row[column] for column in FREQUENCY_COLUMNS}
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    # 복사 없이 배열 버퍼를 그대로 쓰는 DataFrame (읽기 전용, 값을 바꾸려면 .copy())
+    def to_dataframe(self):
+        def view(buffer, dtype):
+            values = np.frombuffer(buffer, dtype=dtype) if len(self) else np.empty(0, dtype)
+            values.flags.writeable = False
+            return values
+
+        columns = {}
+        for column in FREQUENCY_COLUMNS:
+            if column == 'frequency':
+                columns[column] = view(self.frequency, np.float64)
+            elif column == 'is_in_ensembl':
+                columns[column] = view(self.is_in_ensembl, np.bool_)
+            else:
+                columns[column] = pd.Categorical.from_codes(view(self.codes[column], np.int32),
+                                                            pd.Index(self.values[column], dtype=object))
+        self.exported = len(self) > 0
+        return pd.DataFrame(columns, copy=False)
+
+
+# process_rsids 결과(FrequencyRecords), DataFrame, dict 목록 모두 DataFrame 으로
+def to_frame(data):
+    if isinstance(data, FrequencyRecords):
+        return data.to_dataframe()
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data, columns=None if len(data) else FREQUENCY_COLUMNS)
 
-        header_cells = rows[0].find_all(['th', 'td'])
-        headers = [cell.text.strip().upper() for cell in header_cells]
-        print(f"[{rsid}] 헤더: {headers}")
+
+def get_frequency_from_dbsnp(rsid, ref, alt_list, original_rsid=None, page=None):
+    page = page or fetch_dbsnp_page(rsid)
+    if page.status_code != 200:
+        raise Exception(f"[{rsid}] dbSNP 페이지 요청 실패: {page.status_code}")
+
+    results = FrequencyRecords()
+    alt_str = ",".join(alt_list)
+
+    for headers, rows in page.frequency_tables:
+        log(f"[{rsid}] 헤더: {headers}")
 
         if 'REF ALLELE' in headers and 'ALT ALLELE' in headers:
             ref_index = headers.index('REF ALLELE')
@@ -76,8 +839,7 @@ def get_frequency_from_dbsnp(rsid, ref, alt_list, original_rsid=None):
             pop_index = headers.index('POPULATION') if 'POPULATION' in headers else 0
             count_index = headers.index('SAMPLE SIZE') if 'SAMPLE SIZE' in headers else -1
 
-            for row in rows[1:]:
-                cols = [td.text.strip() for td in row.find_all('td')]
+            for cols in rows:
                 if len(cols) <= max(ref_index, alt_index):
                     continue
 
@@ -96,17 +858,8 @@ def get_frequency_from_dbsnp(rsid, ref, alt_list, original_rsid=None):
                     ref_freq = None
 
                 if ref_allele:
-                    results.append({
-                        'rsID': original_rsid or rsid,
-                        'merged_from': rsid if original_rsid and original_rsid != rsid else '',
-                        'population': population,
-                        'allele': ref_allele,
-                        'allele_type': "REF",
-                        'frequency': ref_freq,
-                        'allele_number': allele_number,
-                        'alt_alleles': alt_str,
-                        'is_in_ensembl': True
-                    })
+                    results.add(rsid, original_rsid, population, ref_allele, "REF",
+                                ref_freq, allele_number, alt_str, True)
 
                 alt_allele_entries = cols[alt_index].split(',')
                 for entry in alt_allele_entries:
@@ -121,225 +874,1033 @@ def get_frequency_from_dbsnp(rsid, ref, alt_list, original_rsid=None):
                         continue
 
                     is_in_ensembl = alt_allele in alt_list
-                    results.append({
-                        'rsID': original_rsid or rsid,
-                        'merged_from': rsid if original_rsid and original_rsid != rsid else '',
-                        'population': population,
-                        'allele': alt_allele,
-                        'allele_type': "ALT",
-                        'frequency': alt_freq,
-                        'allele_number': allele_number,
-                        'alt_alleles': alt_str,
-                        'is_in_ensembl': is_in_ensembl
-                    })
+                    results.add(rsid, original_rsid, population, alt_allele, "ALT",
+                                alt_freq, allele_number, alt_str, is_in_ensembl)
     return results
 
-# STEP 3: rsID 보드 처리
-def process_rsids(rsid_list):
-    all_data = []
-    errors = []
 
-    for original_rsid in rsid_list:
-        print(f"🔍 처리 중: {original_rsid}")
+# STEP 2.3: 빈도 데이터 소스 (backend)
+# process_rsids 는 backend 를 통해서만 병합 추적 / REF·ALT / 빈도를 가져옴
+class FrequencyBackend:
+    name = "base"
+
+    # process_rsids 를 시작할 때마다 호출 (이전 호출에서 남은 상태 정리)
+    def reset(self):
+        pass
+
+    # 병합 별칭 인덱스 (Ensembl/dbSNP 에서 발견한 병합 + RsMergeArch) 로 현재 ID 를 찾음
+    def resolve_merged(self, rsid):
+        return _alias_index.resolve(rsid)[0]
+
+    # (ref, alts, rsid) 를 직접 줄 수 있으면 반환, None 이면 Ensembl 에서 조회
+    def get_ref_alt(self, rsid):
+        return None
+
+    def get_frequencies(self, rsid, ref, alt_list, original_rsid=None):
+        raise NotImplementedError
+
+
+# 병합 추적 때 받은 페이지를 빈도 수집 때까지 보관 → 페이지마다 요청/파싱 한 번
+# (목록 크기와 상관없이 보장되도록 크기 제한이 있는 캐시 대신 한 번 쓰면 버리는 dict 사용)
+class DbsnpWebBackend(FrequencyBackend):
+    name = "dbsnp"
+
+    def __init__(self):
+        self.pages = {}
+
+    def reset(self):
+        self.pages.clear()
+
+    def resolve_merged(self, rsid):
+        return resolve_merged_rsid_from_dbsnp(rsid, self.pages)
+
+    def get_frequencies(self, rsid, ref, alt_list, original_rsid=None):
+        return get_frequency_from_dbsnp(rsid, ref, alt_list, original_rsid=original_rsid,
+                                        page=self.pages.pop(rsid, None))
+
+
+# ALFA VCF 의 샘플 열(BioSample ID) → dbSNP 페이지에 나오는 population 이름
+ALFA_POPULATIONS = {
+    'SAMN10492695': "European",
+    'SAMN10492696': "African Others",
+    'SAMN10492697': "East Asian",
+    'SAMN10492698': "African American",
+    'SAMN10492699': "Latin American 1",
+    'SAMN10492700': "Latin American 2",
+    'SAMN10492701': "Other Asian",
+    'SAMN10492702': "South Asian",
+    'SAMN10492703': "African",
+    'SAMN10492704': "Asian",
+    'SAMN10492705': "Total",
+    'SAMN11605645': "Other",
+}
+
+
+# bgzip(BGZF) 파일 읽기: 블록마다 독립된 gzip member 이고, 헤더의 BC 필드에 블록 크기가 있음
+# virtual offset = (블록 시작 위치 << 16) | 블록 안에서의 위치
+class BgzfReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_block(self, offset):
+        header = self.map[offset:offset + 18]
+        if len(header) < 18:
+            return None, offset
+        if header[:4] != b'\x1f\x8b\x08\x04':
+            raise Exception(f"{self.path}: BGZF(bgzip) 형식이 아님 (offset {offset})")
+        xlen = struct.unpack('<H', header[10:12])[0]
+        extra = self.map[offset + 12:offset + 12 + xlen]
+        pos = 0
+        block_size = None
+        while pos + 4 <= len(extra):
+            slen = struct.unpack('<H', extra[pos + 2:pos + 4])[0]
+            if extra[pos:pos + 2] == b'BC':
+                block_size = struct.unpack('<H', extra[pos + 4:pos + 6])[0] + 1
+                break
+            pos += 4 + slen
+        if block_size is None:
+            raise Exception(f"{self.path}: BGZF 블록 크기(BC) 없음 (offset {offset})")
+        data = zlib.decompress(self.map[offset:offset + block_size], 31)
+        return data, offset + block_size
+
+    # (virtual offset, 한 줄) 을 파일 처음부터 차례로
+    def iter_lines(self):
+        offset = 0
+        pending = b''
+        pending_voffset = 0
+        while True:
+            data, next_offset = self.read_block(offset)
+            if data is None:
+                break
+            start = 0
+            while True:
+                end = data.find(b'\n', start)
+                if end < 0:
+                    break
+                voffset = pending_voffset if pending else (offset << 16) | start
+                yield voffset, pending + data[start:end]
+                pending = b''
+                start = end + 1
+            if start < len(data):
+                if not pending:
+                    pending_voffset = (offset << 16) | start
+                pending += data[start:]
+            offset = next_offset
+        if pending:
+            yield pending_voffset, pending
+
+    def read_line(self, voffset):
+        offset, start = voffset >> 16, voffset & 0xFFFF
+        data, offset = self.read_block(offset)
+        line = data[start:]
+        while b'\n' not in line:
+            data, offset = self.read_block(offset)
+            if data is None:
+                break
+            line += data
+        return line.split(b'\n', 1)[0]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+# 로컬 bgzip VCF(ALFA / gnomAD)에서 population 빈도를 읽는 backend
+# 처음 한 번 rsID → virtual offset 인덱스(SQLite)를 만들고, 이후에는 인덱스로 바로 찾아감
+#  - ALFA: FORMAT 이 AN:AC 이고 샘플 열마다 population 하나
+#  - gnomAD: INFO 의 AC_<pop> / AN_<pop> (접미사 없는 AC/AN 은 Total)
+class VcfFrequencyBackend(FrequencyBackend):
+    name = "vcf"
+
+    def __init__(self, vcf_path, index_path=None, population_names=None):
+        self.vcf_path = vcf_path
+        self.index_path = index_path or vcf_path + ".rsidx.sqlite"
+        self.population_names = population_names or ALFA_POPULATIONS
+        self.reader = BgzfReader(vcf_path)
+        self.lock = threading.Lock()
+        self.samples = []
+        for _, line in self.reader.iter_lines():
+            if line.startswith(b'#CHROM'):
+                self.samples = line.decode('utf-8').split('\t')[9:]
+                break
+            if not line.startswith(b'#'):
+                break
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        if not self._index_is_current():
+            self.build_index()
+
+    def _source_signature(self):
+        stat = os.stat(self.vcf_path)
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+    def _index_is_current(self):
         try:
-            merged_rsid_dbsnp = resolve_merged_rsid_from_dbsnp(original_rsid)
-            ref, alts, dbsnp_rsid = get_ref_alt_from_ensembl(merged_rsid_dbsnp)
-            result = get_frequency_from_dbsnp(dbsnp_rsid, ref, alts, original_rsid=original_rsid)
-            for row in result:
-                row['rsID'] = original_rsid
-                row['merged_from'] = dbsnp_rsid if original_rsid != dbsnp_rsid else ''
-            all_data.extend(result)
-        except Exception as e:
-            print(f"⚠️ 오류 발생: {e}")
-            errors.append({'rsID': original_rsid, 'error': str(e)})
-        sleep(1)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        except sqlite3.OperationalError:
+            return False
+        return row is not None and row[0] == self._source_signature()
+
+    def build_index(self, batch_size=100000):
+        print(f"🗂️ VCF rsID 인덱스 생성 중: {self.vcf_path}")
+        with self.lock:
+            self.conn.execute("DROP TABLE IF EXISTS variants")
+            self.conn.execute("DROP TABLE IF EXISTS meta")
+            self.conn.execute("CREATE TABLE variants (rsid TEXT, voffset INTEGER)")
+            self.conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            batch = []
+            for voffset, line in self.reader.iter_lines():
+                if line.startswith(b'#'):
+                    continue
+                ids = line.split(b'\t', 3)[2]
+                for rsid in ids.split(b';'):
+                    if rsid.startswith(b'rs'):
+                        batch.append((rsid.decode('ascii'), voffset))
+                if len(batch) >= batch_size:
+                    self.conn.executemany("INSERT INTO variants VALUES (?, ?)", batch)
+                    batch = []
+            self.conn.executemany("INSERT INTO variants VALUES (?, ?)", batch)
+            self.conn.execute("CREATE INDEX variants_rsid ON variants (rsid)")
+            self.conn.execute("INSERT INTO meta VALUES ('source', ?)", (self._source_signature(),))
+            self.conn.commit()
+
+    def _records(self, rsid):
+        with self.lock:
+            offsets = [row[0] for row in self.conn.execute(
+                "SELECT voffset FROM variants WHERE rsid = ? ORDER BY voffset", (rsid,))]
+        return [self.reader.read_line(v).decode('utf-8').split('\t') for v in offsets]
+
+    def _contains(self, rsid):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM variants WHERE rsid = ? LIMIT 1", (rsid,)).fetchone() is not None
+
+    # 별칭 인덱스의 병합 경로에서 VCF 에 있는 가장 최신 ID 를 사용
+    # (VCF 릴리스가 더 오래됐으면 옛 ID 로 들어 있을 수 있음), 어디에도 없으면 현재 ID → Ensembl 에서 조회
+    def resolve_merged(self, rsid):
+        current, chain = _alias_index.resolve(rsid)
+        for candidate in reversed(chain):
+            if self._contains(candidate):
+                return candidate
+        return current
+
+    def get_ref_alt(self, rsid):
+        records = self._records(rsid)
+        if not records:
+            return None
+        alts = []
+        for cols in records:
+            alts += [a.upper() for a in cols[4].split(',') if a != '.' and a.upper() not in alts]
+        return records[0][3].upper(), alts, rsid
+
+    # population → (AN, {alt: AC})
+    def _counts(self, cols):
+        alts = [a.upper() for a in cols[4].split(',')]
+        counts = {}
+        if len(cols) > 9 and cols[8].split(':')[:2] == ['AN', 'AC']:
+            for sample, value in zip(self.samples, cols[9:]):
+                an, ac = value.split(':')[:2]
+                if an in ('', '.'):
+                    continue
+                acs = [int(x) if x not in ('', '.') else 0 for x in ac.split(',')]
+                counts[self.population_names.get(sample, sample)] = (int(an), dict(zip(alts, acs)))
+        else:
+            info = dict(item.split('=', 1) for item in cols[7].split(';') if '=' in item)
+            for key, an in info.items():
+                if not key.startswith('AN'):
+                    continue
+                suffix = key[2:]
+                ac = info.get('AC' + suffix)
+                if ac is None:
+                    continue
+                population = suffix.lstrip('_') or "Total"
+                acs = [int(x) if x not in ('', '.') else 0 for x in ac.split(',')]
+                counts[population] = (int(an), dict(zip(alts, acs)))
+        return counts
+
+    def get_frequencies(self, rsid, ref, alt_list, original_rsid=None):
+        records = self._records(rsid)
+        if not records:
+            raise Exception(f"[{rsid}] VCF 에 없음: {self.vcf_path}")
+
+        # 같은 rsID 가 여러 줄(ALT 별로 나뉜 경우)에 있으면 population 별로 합침
+        merged = {}
+        ref_allele = records[0][3].upper()
+        for cols in records:
+            for population, (an, acs) in self._counts(cols).items():
+                alts = merged.setdefault(population, (an, {}))[1]
+                for alt, ac in acs.items():
+                    alts.setdefault(alt, ac)
+
+        results = FrequencyRecords()
+        alt_str = ",".join(alt_list)
+        for population, (an, acs) in merged.items():
+            if an <= 0:
+                continue
+            ref_freq = (an - sum(acs.values())) / an
+            results.add(rsid, original_rsid, population, ref_allele, "REF",
+                        ref_freq, str(an), alt_str, True)
+            for alt, ac in acs.items():
+                results.add(rsid, original_rsid, population, alt, "ALT",
+                            ac / an, str(an), alt_str, alt in alt_list)
+        return results
+
+    def close(self):
+        self.reader.close()
+        self.conn.close()
+
+# STEP 3: rsID 보드 처리 (여러 rsID를 동시에 처리, 결과는 입력 순서대로 모음)
+# 3.1 dbSNP 병합 추적 → 3.2 Ensembl 일괄 조회 → 3.3 dbSNP 빈도 수집
+def _resolve_merged_one(backend, original_rsid):
+    log(f"🔍 처리 중: {original_rsid}")
+    try:
+        return backend.resolve_merged(original_rsid), None
+    except Exception as e:
+        log(f"⚠️ 오류 발생: {e}")
+        return None, str(e)
+
+
+def _fetch_frequency_one(backend, original_rsid, ref_alt):
+    ref, alts, dbsnp_rsid = ref_alt
+    try:
+        return backend.get_frequencies(dbsnp_rsid, ref, alts, original_rsid=original_rsid), None
+    except Exception as e:
+        log(f"⚠️ 오류 발생: {e}")
+        return None, str(e)
+
+
+# on_result(rsid, rows, error) 는 rsID 하나가 끝날 때마다 입력 순서대로 호출됨
+# collect=False 면 결과를 메모리에 모으지 않음 (스트리밍용)
+def process_rsids(rsid_list, max_workers=MAX_WORKERS, rate_limits=None, backend=None,
+                  on_result=None, collect=True):
+    if rate_limits:
+        configure_rate_limits(rate_limits)
+    backend = backend or DbsnpWebBackend()
+    backend.reset()
+
+    all_data = FrequencyRecords()
+    errors = []
+    error_by_index = {}
+
+    # with 블록을 쓰면 Ctrl-C 나 오류가 나도 대기열에 남은 작업이 다 끝날 때까지 기다리므로 직접 종료
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        merged_ids = []
+        with metrics.stage('merge_resolution'):
+            resolved = executor.map(partial(_resolve_merged_one, backend), rsid_list)
+            for i, (merged_rsid, error) in enumerate(resolved):
+                merged_ids.append(merged_rsid)
+                if error is not None:
+                    error_by_index[i] = error
+
+        # backend 가 REF/ALT 를 직접 주지 못하는 ID만 Ensembl 에서 일괄 조회
+        ref_alts = {}
+        ensembl_ids = []
+        for i, merged_rsid in enumerate(merged_ids):
+            if i in error_by_index or merged_rsid in ref_alts:
+                continue
+            ref_alt = backend.get_ref_alt(merged_rsid)
+            if ref_alt:
+                ref_alts[merged_rsid] = ref_alt
+            else:
+                ensembl_ids.append(merged_rsid)
+        with metrics.stage('ensembl_lookup'):
+            ensembl_results, ensembl_errors = get_ref_alt_from_ensembl_batch(ensembl_ids)
+        ref_alts.update(ensembl_results)
+        ensembl_failures = {e['rsID']: e['error'] for e in ensembl_errors}
+        for i, merged_rsid in enumerate(merged_ids):
+            if i not in error_by_index and merged_rsid in ensembl_failures:
+                log(f"⚠️ 오류 발생: {ensembl_failures[merged_rsid]}")
+                error_by_index[i] = ensembl_failures[merged_rsid]
+
+        with metrics.stage('frequencies'):
+            futures = {
+                i: executor.submit(_fetch_frequency_one, backend, rsid_list[i], ref_alts[merged_ids[i]])
+                for i in range(len(rsid_list)) if i not in error_by_index
+            }
+            for i, original_rsid in enumerate(rsid_list):
+                result, error = (None, error_by_index[i]) if i in error_by_index else futures.pop(i).result()
+                if error is not None:
+                    errors.append({'rsID': original_rsid, 'error': error})
+                elif collect:
+                    all_data.extend(result)
+                if on_result is not None:
+                    on_result(original_rsid, result, error)
+    except BaseException:
+        # 아직 시작하지 않은 작업은 취소 (이미 보낸 요청만 마저 끝남)
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
 
     return all_data, errors
 
-# STEP 4: population summary (long format)
-def summarize_by_population(data):
-    df = pd.DataFrame(data)
-    df['frequency'] = pd.to_numeric(df['frequency'], errors='coerce')
-    df['allele_number'] = pd.to_numeric(df['allele_number'], errors='coerce')
 
-    summary_rows = []
-    grouped = df.groupby(['rsID', 'population'])
+# STEP 3.1: 스트리밍 처리 — rsID 하나가 끝날 때마다 디스크에 행을 추가하고 체크포인트 기록
+STREAM_CHUNK_SIZE = ENSEMBL_BATCH_SIZE
+
+
+# 확장자가 .csv 면 CSV, 그 외에는 JSON Lines 로 한 줄에 한 행씩 추가
+class RowSink:
+    def __init__(self, path):
+        self.path = path
+        self.is_csv = path.lower().endswith('.csv')
+        self.file = open(path, 'a', encoding='utf-8', newline='')
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=FREQUENCY_COLUMNS)
+            if self.file.tell() == 0:
+                self.writer.writeheader()
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self.is_csv:
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+# 체크포인트: rsID 마다 한 줄 {"rsID", "status": done|failed, "error", "offset"}
+# offset 은 그 rsID 까지 쓴 뒤의 sink 파일 크기 → 재시작 시 그 뒤에 남은 불완전한 행을 잘라냄
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.failed = {}
+        self.offset = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 마지막 줄이 쓰다 만 경우
+                    self.offset = entry.get('offset', self.offset)
+                    if entry['status'] == 'done':
+                        self.done.add(entry['rsID'])
+                        self.failed.pop(entry['rsID'], None)
+                    else:
+                        self.failed[entry['rsID']] = entry.get('error', '')
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def record(self, rsid, error, offset):
+        entry = {'rsID': rsid, 'status': 'failed' if error is not None else 'done', 'offset': offset}
+        if error is not None:
+            entry['error'] = error
+            self.failed[rsid] = error
+        else:
+            self.done.add(rsid)
+            self.failed.pop(rsid, None)
+        self.offset = offset
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def errors(self, rsid_list):
+        return [{'rsID': rsid, 'error': self.failed[rsid]} for rsid in dict.fromkeys(rsid_list) if rsid in self.failed]
+
+    def close(self):
+        self.file.close()
+
+
+# resume=True 면 체크포인트에서 done 인 rsID는 건너뛰고 (failed 는 다시 시도) 이어서 기록
+def stream_rsids(rsid_list, sink_path, checkpoint_path=None, resume=False,
+                 chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+    checkpoint_path = checkpoint_path or sink_path + ".checkpoint.jsonl"
+    if not resume:
+        for path in [sink_path, checkpoint_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    checkpoint = Checkpoint(checkpoint_path)
+    if os.path.exists(sink_path) and os.path.getsize(sink_path) > checkpoint.offset:
+        with open(sink_path, 'r+b') as f:
+            f.truncate(checkpoint.offset)
+    sink = RowSink(sink_path)
+
+    todo = [rsid for rsid in rsid_list if rsid not in checkpoint.done]
+    if resume:
+        print(f"⏩ 이어서 실행: 완료 {len(rsid_list) - len(todo)}개 건너뜀, 남은 {len(todo)}개")
+
+    def on_result(rsid, rows, error):
+        offset = sink.write_rows(rows) if rows else sink.file.tell()
+        checkpoint.record(rsid, error, offset)
+
+    try:
+        for start in range(0, len(todo), chunk_size):
+            process_rsids(todo[start:start + chunk_size], on_result=on_result, collect=False, **kwargs)
+    finally:
+        sink.close()
+        checkpoint.close()
+
+    return checkpoint.errors(rsid_list)
+
+
+# sink 파일(CSV/JSONL)을 process_rsids 결과와 같은 FrequencyRecords 로 읽기
+# 한 줄씩 읽어서 바로 코드로 바꾸므로 sink 전체를 문자열 DataFrame 으로 올리지 않음
+def load_sink_rows(sink_path):
+    records = FrequencyRecords()
+    with open(sink_path, encoding='utf-8', newline='') as f:
+        if sink_path.lower().endswith('.csv'):
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return records
+            column = {name: i for i, name in enumerate(header)}
+            rows = (
+                (cols[column['rsID']], cols[column['merged_from']], cols[column['population']],
+                 cols[column['allele']], cols[column['allele_type']],
+                 float(cols[column['frequency']]) if cols[column['frequency']] else None,
+                 cols[column['allele_number']], cols[column['alt_alleles']], cols[column['is_in_ensembl']] == 'True')
+                for cols in reader
+            )
+        else:
+            rows = (
+                (row['rsID'], row['merged_from'], row['population'], row['allele'], row['allele_type'],
+                 row['frequency'], str(row['allele_number'] or ''), row['alt_alleles'], row['is_in_ensembl'])
+                for row in (json.loads(line) for line in f if line.strip())
+            )
+        for rsid, merged_from, population, allele, allele_type, frequency, allele_number, alt_str, in_ensembl in rows:
+            records.add(merged_from or rsid, rsid, population, allele, allele_type, frequency,
+                        allele_number, alt_str, in_ensembl)
+    return records
+
+# STEP 4: population 요약 — 긴 형식(long)과 넓은 형식(wide)을 같은 입력에서 한 번에 계산
+# rsID/population 을 정수 코드로 바꾸고 (categorical 이면 코드를 그대로 사용),
+# (rsID, population) 그룹마다 Python 루프 대신 numpy 배열 연산으로 "첫 번째 행"을 찾음
+SUMMARY_COLUMNS = ['rsID', 'population', 'sample_size', 'REF_allele', 'REF_freq',
+                   'alt_alleles', 'ALT_allele', 'ALT_freq']
+
+
+# 정렬된 고유값 기준 정수 코드 (결측은 -1)
+def _sorted_codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        codes = series.cat.codes.to_numpy()
+        if categories.is_monotonic_increasing:
+            return codes, categories
+        order = np.argsort(categories.to_numpy(), kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return np.where(codes >= 0, rank[codes], -1), categories[order]
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, uniques
+
+
+# 정렬이 필요 없는 정수 코드 (categorical 이면 코드를 int8 등 원래 폭 그대로 사용)
+def _codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series)
 
-    for (rsid, population), group in grouped:
-        row = {'rsID': rsid, 'population': population, 'sample_size': None}
-        ref_row = group[group['allele_type'] == 'REF']
-        alt_row = group[group['allele_type'] == 'ALT']
 
-        if not ref_row.empty:
-            row['REF_allele'] = ref_row.iloc[0]['allele']
-            row['REF_freq'] = ref_row.iloc[0]['frequency']
-            row['sample_size'] = ref_row.iloc[0]['allele_number']
-            row['alt_alleles'] = ref_row.iloc[0].get('alt_alleles', '')
+# rows 를 주면 그 행들만 변환 (-1 은 NaN)
+def _as_numeric(series, rows=None):
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        return values if rows is None else _take(values, rows)
+    # 같은 값이 반복되는 경우가 많아서 고유값만 변환
+    codes, uniques = _codes(series)
+    if rows is not None:
+        codes = np.where(rows >= 0, codes[rows], -1)
+    uniques = np.asarray(uniques, dtype=object)
+    try:
+        converted = uniques.astype(float)  # 숫자 문자열뿐이면 to_numeric 보다 훨씬 빠름
+    except (TypeError, ValueError):
+        converted = pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce').to_numpy(dtype=float)
+    return np.append(converted, np.nan)[codes]  # 코드 -1 → 마지막의 NaN
 
-        if not alt_row.empty:
-            row['ALT_allele'] = alt_row.iloc[0]['allele']
-            row['ALT_freq'] = alt_row.iloc[0]['frequency']
-            if row['sample_size'] is None:
-                row['sample_size'] = alt_row.iloc[0]['allele_number']
-            row['alt_alleles'] = alt_row.iloc[0].get('alt_alleles', '')
 
-        if 'REF_freq' in row or 'ALT_freq' in row:
-            summary_rows.append(row)
+def _take(values, index):
+    return pd.api.extensions.take(np.asarray(values), index, allow_fill=True)
+
+
+@timed('summarize')
+def build_population_summaries(data):
+    df = to_frame(data)
+    n_rows = len(df)
+
+    rs_codes, rs_values = _sorted_codes(df['rsID'])
+    pop_codes, pop_values = _sorted_codes(df['population'])
+    n_pops = max(len(pop_values), 1)
+    valid = (rs_codes >= 0) & (pop_codes >= 0)
+    is_ref = (df['allele_type'] == 'REF').to_numpy(dtype=bool, na_value=False) & valid
+    is_alt = (df['allele_type'] == 'ALT').to_numpy(dtype=bool, na_value=False) & valid
+
+    # 그룹 번호: (rsID 코드, population 코드) 조합이 촘촘하면 그대로, 아니면 factorize 후 정렬
+    # 촘촘한 경우 그룹 번호가 곧 키 순서이므로 order 는 None (다시 정렬하는 복사를 생략)
+    group_key = rs_codes.astype(np.int64) * n_pops + pop_codes
+    if len(rs_values) * n_pops <= 4 * n_rows + 1024:
+        group_ids = np.where(valid, group_key, 0)
+        group_keys = np.arange(len(rs_values) * n_pops, dtype=np.int64)
+        order = None
+    else:
+        group_ids, group_keys = pd.factorize(group_key)
+        order = np.argsort(group_keys, kind='stable')
+        group_keys = group_keys[order]
+    n_groups = len(group_keys)
+
+    frequency = _as_numeric(df['frequency'])
+    freq_present = ~np.isnan(frequency)
+    allele_codes, allele_values = _codes(df['allele'])
+    allele_present = allele_codes >= 0
+
+    # 그룹별 첫 번째 REF / ALT 행 번호 (없으면 -1): 두 종류를 한 번의 scatter 로 계산
+    rows = np.flatnonzero(is_ref | is_alt)
+    first = np.full(2 * n_groups, n_rows, dtype=np.int64)
+    np.minimum.at(first, group_ids[rows] * 2 + is_alt[rows], rows)
+    first[first == n_rows] = -1
+    ref_group_first, alt_group_first = first[0::2], first[1::2]
+
+    # wide 용: mask 행 중 present 인 첫 행. 첫 행에 값이 있으면 그대로 쓰고,
+    # 값이 없는 그룹만 다시 scatter (대부분 첫 행에 값이 있으므로 전체 행을 다시 돌지 않음)
+    def first_present(group_first, mask, present):
+        found = group_first >= 0
+        ok = found & present[group_first]
+        result = np.where(ok, group_first, -1)
+        redo = found & ~ok
+        if redo.any():
+            rows = np.flatnonzero(mask & present & redo[group_ids])
+            retry = np.full(n_groups, n_rows, dtype=np.int64)
+            np.minimum.at(retry, group_ids[rows], rows)
+            result[redo] = np.where(retry[redo] < n_rows, retry[redo], -1)
+        return result
+
+    # 그룹 키 순서로 정렬한 뒤 REF/ALT 가 하나라도 있는 그룹만 남김
+    def arrange(group_first):
+        return (group_first if order is None else group_first[order])[keep]
+
+    ref_first = ref_group_first if order is None else ref_group_first[order]
+    alt_first = alt_group_first if order is None else alt_group_first[order]
+    keep = np.flatnonzero((ref_first >= 0) | (alt_first >= 0))
+    if len(keep) == n_groups:
+        keep = slice(None)  # 모든 그룹이 남으면 인덱싱 복사 생략
+    group_rs = group_keys[keep] // n_pops
+    group_pop = group_keys[keep] % n_pops
+    ref_first, alt_first = ref_first[keep], alt_first[keep]
+
+    # long: 그룹별 첫 번째 REF 행 + 첫 번째 ALT 행 (문자열 열은 코드에서 바로 categorical 로 만듦)
+    def pick(codes, rows):
+        return np.where(rows >= 0, codes[rows], -1)
+
+    size_row = np.where(ref_first >= 0, ref_first, alt_first)
+    alt_alleles_row = np.where(alt_first >= 0, alt_first, ref_first)
+    alt_alleles_codes, alt_alleles_values = _codes(df['alt_alleles'])
+    long = pd.DataFrame({
+        'rsID': pd.Categorical.from_codes(group_rs, rs_values),
+        'population': pd.Categorical.from_codes(group_pop, pop_values),
+        'sample_size': _as_numeric(df['allele_number'], size_row),
+        'REF_allele': pd.Categorical.from_codes(pick(allele_codes, ref_first), allele_values),
+        'REF_freq': _take(frequency, ref_first),
+        'alt_alleles': pd.Categorical.from_codes(pick(alt_alleles_codes, alt_alleles_row), alt_alleles_values),
+        'ALT_allele': pd.Categorical.from_codes(pick(allele_codes, alt_first), allele_values),
+        'ALT_freq': _take(frequency, alt_first),
+    }, columns=SUMMARY_COLUMNS, copy=False)
+
+    # wide: 그룹별로 null 이 아닌 첫 값 → (rsID x population) 행렬로 펼침
+    # group_rs 는 그룹 키 순서라서 이미 정렬되어 있음 → np.unique (정렬) 대신 경계만 찾음
+    new_rs = np.ones(len(group_rs), dtype=bool)
+    new_rs[1:] = group_rs[1:] != group_rs[:-1]
+    present_rs = group_rs[new_rs]
+    row_of_group = np.cumsum(new_rs) - 1
+    shape = (len(present_rs), n_pops)
+    cell = row_of_group * n_pops + group_pop
+    # 모든 칸이 채워지면 cell 은 0, 1, 2, ... 그대로라서 scatter 없이 reshape 만 하면 됨
+    full_grid = len(cell) == shape[0] * shape[1]
+
+    # first 는 long 에서 쓴 (정렬된) 첫 행 — 모든 행에 값이 있으면 그대로 씀
+    def spread(first, group_first, mask, present, values, fill):
+        if not present.all():
+            first = arrange(first_present(group_first, mask, present))
+        picked = np.where(first >= 0, values[first], fill).astype(values.dtype, copy=False)
+        if full_grid:
+            return picked.reshape(shape)
+        flat = np.full(shape[0] * shape[1], fill, dtype=values.dtype)
+        flat[cell] = picked
+        return flat.reshape(shape)
+
+    ref_freq = spread(ref_first, ref_group_first, is_ref, freq_present, frequency, np.nan)
+    alt_freq = spread(alt_first, alt_group_first, is_alt, freq_present, frequency, np.nan)
+    ref_allele = spread(ref_first, ref_group_first, is_ref, allele_present, allele_codes, -1)
+    alt_allele = spread(alt_first, alt_group_first, is_alt, allele_present, allele_codes, -1)
+
+    # rsID 별 대표 allele: population 순서대로 봤을 때 처음 나오는 값
+    # allele 열은 long 과 마찬가지로 코드에서 바로 categorical 로 만듦 (문자열 열로 바꾸는 비용이 큼)
+    alleles = pd.Index(allele_values, dtype=object)
+
+    def first_in_row(matrix):
+        present = matrix >= 0
+        column = present.argmax(axis=1)
+        codes = np.where(present.any(axis=1), matrix[np.arange(len(matrix)), column], -1)
+        return pd.Categorical.from_codes(codes, alleles)
+
+    columns = {
+        'rsID': np.asarray(rs_values, dtype=object)[present_rs],
+        'REF_allele': first_in_row(ref_allele),
+        'ALT_allele': first_in_row(alt_allele),
+    }
+    for j in np.flatnonzero(~np.isnan(ref_freq).all(axis=0)):
+        columns[f"{pop_values[j]}_REF"] = ref_freq[:, j]
+    for j in np.flatnonzero(~np.isnan(alt_freq).all(axis=0)):
+        columns[f"{pop_values[j]}_ALT"] = alt_freq[:, j]
+    for j in np.flatnonzero((alt_allele >= 0).any(axis=0)):
+        columns[f"{pop_values[j]}_ALT_allele"] = pd.Categorical.from_codes(alt_allele[:, j], alleles)
+    wide = pd.DataFrame(columns, copy=False)
+
+    return long, wide
+
+
+# STEP 4.1: population summary (long format)
+def summarize_by_population(data):
+    return build_population_summaries(data)[0]
 
-    return pd.DataFrame(summary_rows)
 
 # STEP 5: 넓은 형식 요약 + ALT allele 이름 포함
 def reshape_population_summary_wide(data):
-    df = pd.DataFrame(data)
-    df['frequency'] = pd.to_numeric(df['frequency'], errors='coerce')
+    return build_population_summaries(data)[1]
 
-    ref_df = df[df['allele_type'] == 'REF'][['rsID', 'population', 'allele', 'frequency']]
-    alt_df = df[df['allele_type'] == 'ALT'][['rsID', 'population', 'allele', 'frequency']]
+# STEP 6: 저장 함수
+# 표는 한 번만 만들고, 형식별(xlsx/csv/parquet/feather) 파일 쓰기는 스레드로 동시에 실행
+OUTPUT_FORMATS = ['xlsx', 'csv', 'parquet', 'feather']
+EXCEL_MAX_ROWS = 1048576
+# 시트 이름 → 파일 이름 (확장자 제외), 'xlsx' 는 모든 시트를 담는 엑셀 파일
+OUTPUT_STEMS = {
+    'xlsx': "combined_frequencies",
+    'Allele_Frequencies': "combined_frequencies",
+    'Population_Summary': "population_summary",
+    'Population_Wide': "population_summary_wide",
+    'Errors': "frequency_errors",
+}
 
-    ref_df = ref_df.rename(columns={'allele': 'REF_allele', 'frequency': 'REF_freq'})
-    alt_df = alt_df.rename(columns={'allele': 'ALT_allele', 'frequency': 'ALT_freq'})
 
-    merged = pd.merge(ref_df, alt_df, on=['rsID', 'population'], how='outer')
+def build_output_tables(data, errors):
+    df = to_frame(data)
+    df_summary, df_wide = build_population_summaries(df)
+    tables = {
+        'Allele_Frequencies': df,
+        'Population_Summary': df_summary,
+        'Population_Wide': df_wide,
+    }
+    if errors:
+        tables['Errors'] = pd.DataFrame(errors, columns=['rsID', 'error'])
+    return tables
 
-    ref_pivot = merged.pivot_table(index='rsID', columns='population', values='REF_freq', aggfunc='first')
-    alt_freq_pivot = merged.pivot_table(index='rsID', columns='population', values='ALT_freq', aggfunc='first')
-    alt_allele_pivot = merged.pivot_table(index='rsID', columns='population', values='ALT_allele', aggfunc='first')
 
-    ref_pivot.columns = [f"{pop}_REF" for pop in ref_pivot.columns]
-    alt_freq_pivot.columns = [f"{pop}_ALT" for pop in alt_freq_pivot.columns]
-    alt_allele_pivot.columns = [f"{pop}_ALT_allele" for pop in alt_allele_pivot.columns]
+EXCEL_CHUNK_ROWS = 10000
 
-    allele_info = merged.groupby('rsID').first().reset_index()[['rsID', 'REF_allele', 'ALT_allele']]
 
-    final_df = allele_info.set_index('rsID').join([
-        ref_pivot, alt_freq_pivot, alt_allele_pivot
-    ]).reset_index()
+def _excel_rows(table):
+    # NaN/NA 는 빈 칸, numpy 값은 파이썬 기본형으로 바꿔서 조금씩 넘김
+    for start in range(0, len(table), EXCEL_CHUNK_ROWS):
+        chunk = table.iloc[start:start + EXCEL_CHUNK_ROWS].astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def _write_excel(tables, path):
+    fits = {}
+    for sheet, table in tables.items():
+        if len(table) >= EXCEL_MAX_ROWS:
+            print(f"⚠️ {sheet}: {len(table)}행은 엑셀 시트 한도를 넘어서 {path} 에서 제외 (csv/parquet 사용)")
+        else:
+            fits[sheet] = table
+    tables = fits
+
+    # xlsxwriter 가 있으면 constant_memory 모드로 기록
+    # 이 모드는 다음 행을 쓰는 순간 이전 행을 파일로 내보내므로 (열 단위로 쓰는 to_excel 은 사용 불가) 행 순서대로 write_row
+    if importlib.util.find_spec('xlsxwriter') is not None:
+        import xlsxwriter
+        with xlsxwriter.Workbook(path, {'constant_memory': True}) as workbook:
+            for sheet, table in tables.items():
+                worksheet = workbook.add_worksheet(sheet)
+                worksheet.write_row(0, 0, [str(column) for column in table.columns])
+                for row_number, row in enumerate(_excel_rows(table), start=1):
+                    worksheet.write_row(row_number, 0, row)
+        return [path]
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for sheet, table in tables.items():
+            table.to_excel(writer, sheet_name=sheet, index=False)
+    return [path]
+
+
+def _write_table(table, path, fmt):
+    if fmt == 'csv':
+        table.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        table.to_parquet(path, index=False)
+    elif fmt == 'feather':
+        table.reset_index(drop=True).to_feather(path)
+    return [path]
+
+
+# 형식 이름과 필요한 패키지를 미리 확인 (조회를 다 끝낸 뒤 저장 단계에서 실패하지 않도록)
+def check_output_formats(formats):
+    unknown = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+    if unknown:
+        raise Exception(f"지원하지 않는 출력 형식: {', '.join(unknown)} (가능: {', '.join(OUTPUT_FORMATS)})")
+    needs_arrow = [fmt for fmt in formats if fmt in ('parquet', 'feather')]
+    if needs_arrow and importlib.util.find_spec('pyarrow') is None:
+        raise Exception(f"{', '.join(needs_arrow)} 형식은 pyarrow 가 필요합니다 (pip install pyarrow)")
+
+
+@timed('export')
+def write_tables(tables, formats=('xlsx', 'csv'), output_dir=".", names=None, max_workers=None):
+    check_output_formats(formats)
+    names = {**OUTPUT_STEMS, **(names or {})}
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    for fmt in formats:
+        if fmt == 'xlsx':
+            jobs.append((_write_excel, tables, os.path.join(output_dir, names['xlsx'] + ".xlsx")))
+        else:
+            for sheet, table in tables.items():
+                jobs.append((_write_table, table, os.path.join(output_dir, f"{names[sheet]}.{fmt}"), fmt))
+
+    written = []
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(jobs), 1)) as executor:
+        for paths in executor.map(lambda job: job[0](*job[1:]), jobs):
+            written.extend(paths)
+    return written
 
-    return final_df
 
-# STEP 6: 저장 함수
 def save_outputs(data, errors,
                  excel_file="combined_frequencies.xlsx",
-                 csv_file="combined_frequencies.csv"):
-
-    df = pd.DataFrame(data)
-    df_summary = summarize_by_population(data)
-    df_wide = reshape_population_summary_wide(data)
-
-    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name="Allele_Frequencies", index=False)
-        df_summary.to_excel(writer, sheet_name="Population_Summary", index=False)
-        df_wide.to_excel(writer, sheet_name="Population_Wide", index=False)
-        if errors:
-            df_errors = pd.DataFrame(errors)
-            df_errors.to_excel(writer, sheet_name="Errors", index=False)
-
-    df.to_csv(csv_file, index=False)
-    df_summary.to_csv("population_summary.csv", index=False)
-    df_wide.to_csv("population_summary_wide.csv", index=False)
-    if errors:
-        df_errors.to_csv("frequency_errors.csv", index=False)
+                 csv_file="combined_frequencies.csv",
+                 formats=('xlsx', 'csv'),
+                 output_dir="."):
+
+    tables = build_output_tables(data, errors)
+    names = {
+        'xlsx': os.path.splitext(excel_file)[0],
+        'Allele_Frequencies': os.path.splitext(csv_file)[0],
+    }
+    written = write_tables(tables, formats, output_dir, names)
 
     print("✅ 저장 완료:")
-    print(f"  - {excel_file}")
-    print(f"  - {csv_file}")
-    print(f"  - population_summary.csv")
-    print(f"  - population_summary_wide.csv")
+    for path in written:
+        print(f"  - {path}")
+    return written
+
+# STEP 7: 입력 rsID 읽기 / 샤드 나누기 / 샤드 결과 합치기
+RSID_PATTERN = re.compile(r'(?:rs)?0*(\d+)', re.IGNORECASE)
 
-# STEP 7: 실행 예시
+
+# 공백 제거, 대소문자 통일, 숫자만 있으면 rs 를 붙임
+# 형식에 맞지 않는 ID (예: rs1805007.2) 는 그대로 두어서 조회 단계에서 오류로 기록되게 함
+def normalize_rsid(token):
+    token = token.strip()
+    match = RSID_PATTERN.fullmatch(token)
+    return f"rs{match.group(1)}" if match else token
+
+
+# 파일(.gz 가능) 또는 '-'(표준 입력)에서 rsID 를 읽어 정규화 + 중복 제거 (처음 나온 순서 유지)
+# 한 줄에 여러 개면 공백이나 쉼표로 구분, # 뒤는 주석
+def read_rsids(paths):
+    rsids = {}
+    for path in paths:
+        if path == '-':
+            f = sys.stdin
+        elif path.endswith('.gz'):
+            f = gzip.open(path, 'rt', encoding='utf-8')
+        else:
+            f = open(path, encoding='utf-8')
+        try:
+            for line in f:
+                for token in re.split(r'[\s,]+', line.split('#', 1)[0]):
+                    if token:
+                        rsids.setdefault(normalize_rsid(token), None)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+    return list(rsids)
+
+
+def parse_shard(text):
+    match = re.fullmatch(r'(\d+)/(\d+)', text.strip())
+    if not match or not 0 <= int(match.group(1)) < int(match.group(2)):
+        raise Exception(f"샤드 형식은 i/N (0 ≤ i < N) 이어야 합니다: {text}")
+    return int(match.group(1)), int(match.group(2))
+
+
+# HOST=N (예: www.ncbi.nlm.nih.gov=10) → (호스트, 초당 요청 수)
+def parse_rate_limit(text):
+    host, _, rate = text.partition('=')
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = 0
+    if not host.strip() or rate <= 0:
+        raise Exception(f"요청 제한 형식은 HOST=N (N > 0) 이어야 합니다: {text}")
+    return host.strip(), rate
+
+
+# 입력 순서나 실행 환경과 상관없이 같은 rsID 는 항상 같은 샤드로 감 (hash() 는 프로세스마다 달라서 md5 사용)
+def shard_of(rsid, shard_count):
+    return int(hashlib.md5(rsid.encode('utf-8')).hexdigest()[:16], 16) % shard_count
+
+
+def select_shard(rsid_list, shard_index, shard_count):
+    return [rsid for rsid in rsid_list if shard_of(rsid, shard_count) == shard_index]
+
+
+# 샤드 출력 폴더 안에서 읽을 파일 우선순위 (xlsx 는 시트 행 수 한도가 있어서 제외)
+MERGE_INPUT_FORMATS = ['parquet', 'feather', 'csv', 'jsonl']
+
+
+def load_frequency_table(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith('.feather'):
+        return pd.read_feather(path)
+    return to_frame(load_sink_rows(path))
+
+
+def load_error_table(path):
+    if path.endswith('.csv'):
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    return load_frequency_table(path)
+
+
+def _find_output(directory, stem):
+    for fmt in MERGE_INPUT_FORMATS:
+        path = os.path.join(directory, f"{stem}.{fmt}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# 샤드마다 저장한 결과(출력 폴더 또는 Allele_Frequencies 파일)를 합쳐서 save_outputs 와 같은 표를 다시 만듦
+# 같은 rsID 가 여러 입력에 있으면 (샤드를 다시 돌린 경우 등) 앞쪽 입력의 결과만 사용
+def merge_outputs(inputs, formats=('xlsx', 'csv'), output_dir="."):
+    frames = []
+    errors = []
+    seen = set()
+    for path in inputs:
+        errors_path = None
+        if os.path.isdir(path):
+            directory = path
+            errors_path = _find_output(directory, OUTPUT_STEMS['Errors'])
+            path = _find_output(directory, OUTPUT_STEMS['Allele_Frequencies'])
+            if path is None:
+                raise Exception(f"샤드 결과 파일이 없습니다: {directory}")
+        df = load_frequency_table(path)
+        df = df[~df['rsID'].isin(seen)]
+        seen.update(df['rsID'].unique())
+        frames.append(df)
+        if errors_path is not None:
+            errors.extend(load_error_table(errors_path).to_dict('records'))
+        log(f"📎 {path}: {df['rsID'].nunique()}개 rsID, {len(df)}행")
+
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FREQUENCY_COLUMNS)
+    errors = list({e['rsID']: e for e in errors if e['rsID'] not in seen}.values())
+    written = write_tables(build_output_tables(data, errors), formats, output_dir)
+
+    print("✅ 병합 완료:")
+    for path in written:
+        print(f"  - {path}")
+    return written
+
+
+# STEP 8: 명령행 실행
+#   python nayoung_ori.py run rsid_panel.txt --shard 0/4     (run 은 생략 가능)
+#   cat ids.txt | python nayoung_ori.py run - --formats parquet
+#   python nayoung_ori.py merge shard_0_of_4 shard_1_of_4 shard_2_of_4 shard_3_of_4
 if __name__ == "__main__":
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--formats', default="xlsx,csv", help=f"출력 형식, 쉼표로 구분 ({', '.join(OUTPUT_FORMATS)})")
+    common.add_argument('--output-dir', help="출력 파일을 저장할 폴더 (기본: 현재 폴더, 샤드면 shard_<i>_of_<N>)")
+    common.add_argument('--quiet', action='store_true', help="rsID 마다 찍는 진행 메시지 끄기")
+    common.add_argument('--metrics', metavar='FILE', help="단계별 시간 / HTTP 통계 저장 (.prom 이면 Prometheus, 아니면 JSON)")
+
+    parser = argparse.ArgumentParser(description="dbSNP/Ensembl allele frequency 수집")
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', parents=[common], help="rsID 목록 처리 (기본 명령)")
+    run_parser.add_argument('inputs', nargs='+', metavar='INPUT', help="rsID 목록 파일 (.gz 가능, - 는 표준 입력)")
+    run_parser.add_argument('--shard', metavar='i/N', help="목록을 N 개로 나눠서 i 번째(0부터)만 처리")
+    run_parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="동시에 처리할 요청 수")
+    run_parser.add_argument('--rate-limit', action='append', default=[], metavar='HOST=N',
+                            help="호스트별 초당 요청 수 (여러 번 지정 가능, 기본: "
+                                 + ", ".join(f"{host}={rate}" for host, rate in RATE_LIMITS.items()) + ")")
+    run_parser.add_argument('--cache', default=CACHE_PATH, help="응답 캐시 SQLite 파일 경로")
+    run_parser.add_argument('--no-cache', action='store_true', help="응답 캐시 사용 안 함")
+    run_parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL / 86400, help="캐시 유효 기간 (일)")
+    run_parser.add_argument('--cache-max-mb', type=float, default=CACHE_MAX_BYTES / 1024 ** 2, help="캐시 최대 크기 (MB)")
+    run_parser.add_argument('--offline', action='store_true', help="네트워크 없이 캐시에 있는 응답만 사용")
+    run_parser.add_argument('--alias-index', default=ALIAS_INDEX_PATH, help="rsID 병합 별칭 인덱스 SQLite 파일 경로")
+    run_parser.add_argument('--load-merge-history', metavar='FILE', help="dbSNP RsMergeArch.bcp(.gz) 를 별칭 인덱스에 불러오기")
+    run_parser.add_argument('--vcf', help="dbSNP 대신 빈도를 읽을 로컬 bgzip VCF (ALFA/gnomAD)")
+    run_parser.add_argument('--vcf-index', help="VCF rsID 인덱스 파일 경로 (기본: <vcf>.rsidx.sqlite)")
+    run_parser.add_argument('--stream', metavar='SINK', help="rsID 마다 결과를 바로 추가할 파일 (.csv 또는 .jsonl)")
+    run_parser.add_argument('--checkpoint', help="체크포인트 파일 경로 (기본: <SINK>.checkpoint.jsonl)")
+    run_parser.add_argument('--resume', action='store_true', help="체크포인트에서 완료된 rsID는 건너뛰고 이어서 실행")
+
+    merge_parser = subparsers.add_parser('merge', parents=[common], help="샤드 결과 합치기")
+    merge_parser.add_argument('inputs', nargs='+', metavar='INPUT',
+                              help="샤드 출력 폴더 또는 Allele_Frequencies 파일 (.parquet/.feather/.csv/.jsonl)")
+
+    argv = sys.argv[1:]
+    if argv and argv[0] not in subparsers.choices and argv[0] not in ('-h', '--help'):
+        argv = ['run'] + argv
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.error("명령을 지정하세요 (run / merge)")
+
+    QUIET = args.quiet
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    try:
+        check_output_formats(formats)
+    except Exception as e:
+        parser.error(str(e))
+
+    if args.command == 'merge':
+        merge_outputs(args.inputs, formats, args.output_dir or ".")
+    else:
+        rsid_list = read_rsids(args.inputs)
+        output_dir = args.output_dir or "."
+        print(f"📋 입력 rsID {len(rsid_list)}개 (중복 제거 후)")
+        if args.shard:
+            try:
+                shard_index, shard_count = parse_shard(args.shard)
+            except Exception as e:
+                parser.error(str(e))
+            rsid_list = select_shard(rsid_list, shard_index, shard_count)
+            output_dir = args.output_dir or f"shard_{shard_index}_of_{shard_count}"
+            print(f"🧩 샤드 {shard_index}/{shard_count}: {len(rsid_list)}개 처리 → {output_dir}")
+
+        if args.workers < 1:
+            parser.error("--workers 는 1 이상이어야 합니다")
+        try:
+            rate_limits = dict(parse_rate_limit(text) for text in args.rate_limit)
+        except Exception as e:
+            parser.error(str(e))
+
+        if args.no_cache and args.offline:
+            parser.error("--offline 은 캐시가 있어야 합니다")
+        configure_cache(None if args.no_cache else args.cache,
+                        ttl=args.cache_ttl * 86400,
+                        max_bytes=int(args.cache_max_mb * 1024 ** 2),
+                        offline=args.offline)
+        alias_index = configure_alias_index(args.alias_index)
+        if args.load_merge_history:
+            loaded = alias_index.load_rsmergearch(args.load_merge_history)
+            print(f"📥 병합 기록 {loaded}건 불러옴: {args.load_merge_history}")
+
+        backend = VcfFrequencyBackend(args.vcf, args.vcf_index) if args.vcf else None
+        options = dict(max_workers=args.workers, rate_limits=rate_limits, backend=backend)
+
+        if args.resume and not args.stream:
+            parser.error("--resume 은 --stream 과 같이 사용해야 합니다")
+        if args.stream:
+            errors = stream_rsids(rsid_list, args.stream, args.checkpoint, resume=args.resume, **options)
+            results = load_sink_rows(args.stream)
+        else:
+            results, errors = process_rsids(rsid_list, **options)
+        save_outputs(results, errors, formats=formats, output_dir=output_dir)
 
-    rsid_list = [
-
-        "rs10073425", "rs10152544", "rs10174949", "rs10214273", "rs1059513", "rs10738626", "rs10790275", "rs10791824",
-        "rs10796303", "rs10822037", "rs10833", "rs10836538", "rs10888499", "rs10988863", "rs10995245", "rs10995251",
-        "rs10995255", "rs10995256", "rs11033603", "rs11171739", "rs11205006", "rs112111458", "rs11216206", "rs11236791",
-        "rs11236809", "rs11236813", "rs112385344", "rs114503346", "rs115161931", "rs117137535", "rs11786685",
-        "rs11811788", "rs118162691", "rs11857092", "rs12123821", "rs12126142", "rs12133641", "rs12138773", "rs12144049",
-        "rs1214598", "rs12153855", "rs12244238", "rs12251307", "rs12295535", "rs12565349", "rs12586305", "rs12634229",
-        "rs12743520", "rs1295686", "rs13015714", "rs13097010", "rs13403179", "rs1358175", "rs1409123", "rs1438673",
-        "rs1444418", "rs1444789", "rs146527530", "rs148161264", "rs149199808", "rs150979174", "rs1665050", "rs16862519",
-        "rs16999165", "rs17132590", "rs17368814", "rs17371133", "rs17389644", "rs176095", "rs17881320", "rs183884396",
-        "rs1861246", "rs187080438", "rs187325802", "rs188069315", "rs188720898", "rs189163698", "rs2050190",
-        "rs2075943", "rs2164983", "rs2212434", "rs2227491", "rs2259735", "rs2271404", "rs2272128", "rs2415269",
-        "rs2426500", "rs2542147", "rs2766664", "rs280024", "rs28383323", "rs28383330", "rs28406364", "rs28520436",
-        "rs28558565", "rs2897442", "rs2967677", "rs301804", "rs3091307", "rs3099143", "rs3125788", "rs3126085",
-        "rs3208007", "rs34215892", "rs34290285", "rs35073649", "rs35570272", "rs35766269", "rs3757723", "rs3848669",
-        "rs3853601", "rs3862469", "rs3864302", "rs3947727", "rs41268896", "rs41293876", "rs4131280", "rs4247364",
-        "rs4262739", "rs4312054", "rs4532376", "rs45599938", "rs45605540", "rs4574025", "rs4705908", "rs4706020",
-        "rs471144", "rs4713555", "rs4722404", "rs4759228", "rs4796793", "rs479844", "rs4821544", "rs4821569",
-        "rs4845373", "rs4906263", "rs5005507", "rs538763482", "rs56101042", "rs56302621", "rs56308324", "rs5743614",
-        "rs59039403", "rs593982", "rs6023002", "rs6062486", "rs61776548", "rs61815704", "rs61816766", "rs61865882",
-        "rs61878692", "rs62193132", "rs629326", "rs6461503", "rs659529", "rs6661961", "rs6720763", "rs675531",
-        "rs67766926", "rs6785012", "rs6808249", "rs6996614", "rs7000782", "rs705699", "rs7110818", "rs7127307",
-        "rs7130588", "rs7147439", "rs71625130", "rs72702813", "rs72702900", "rs72823628", "rs72925996", "rs72943976",
-        "rs73018933", "rs75024669", "rs7542147", "rs759382", "rs7613051", "rs7701967", "rs7717955", "rs7815944",
-        "rs7843258", "rs7857407", "rs78914480", "rs7927894", "rs7936323", "rs79497729", "rs80199341", "rs8086340",
-        "rs821429", "rs847", "rs848", "rs859723", "rs878860", "rs891058", "rs909341", "rs9275218", "rs9368677",
-        "rs9469099", "rs952558", "rs9540294", "rs9540298", "rs9864845", "rs989437", "rs9911533", "rs9923856",
-        "rs1003878", "rs1024161", "rs1033500", "rs1063355", "rs10760706", "rs1077393", "rs10807113", "rs10876864",
-        "rs10947262", "rs1107345", "rs11155700", "rs11752643", "rs11759611", "rs12177980", "rs12183587", "rs12202737",
-        "rs12213837", "rs1270942", "rs13199787", "rs13729", "rs1413901", "rs142986308", "rs16898264", "rs1701704",
-        "rs17429444", "rs17500468", "rs1794282", "rs1860545", "rs1980493", "rs2009345", "rs2010259", "rs2051549",
-        "rs2069408", "rs2070600", "rs2071800", "rs2072633", "rs2076530", "rs2076537", "rs2137497", "rs2155219",
-        "rs2187668", "rs2216164", "rs2239804", "rs2269426", "rs2292239", "rs2301271", "rs231726", "rs231735",
-        "rs231775", "rs231804", "rs2395162", "rs2395163", "rs2395174", "rs2395175", "rs2395182", "rs2442749",
-        "rs2476601", "rs2647012", "rs2647050", "rs2856717", "rs2856718", "rs2856725", "rs2858305", "rs2858331",
-        "rs2858332", "rs2859078", "rs304650", "rs3096851", "rs3096866", "rs3104404", "rs3104405", "rs3115553",
-        "rs3115573", "rs3116504", "rs3117099", "rs3118470", "rs3129871", "rs3129890", "rs3129939", "rs3129943",
-        "rs3129963", "rs3130315", "rs3130320", "rs3130340", "rs3135353", "rs3763309", "rs3763312", "rs377763",
-        "rs3789129", "rs3817973", "rs389883", "rs389884", "rs405875", "rs4147359", "rs4151657", "rs437179", "rs4424066",
-        "rs470138", "rs494620", "rs547077", "rs547261", "rs574087", "rs6457536", "rs6457617", "rs652888", "rs653178",
-        "rs6901084", "rs6903130", "rs6910071", "rs6911628", "rs6935051", "rs6935269", "rs6941112", "rs694739",
-        "rs705708", "rs706779", "rs707928", "rs7192", "rs7453920", "rs7500151", "rs7682241", "rs7682481", "rs773107",
-        "rs7745656", "rs7756516", "rs7758736", "rs7775397", "rs805294", "rs805303", "rs8111", "rs926169", "rs9267947",
-        "rs9268132", "rs9268368", "rs9268384", "rs9268528", "rs9268530", "rs9268542", "rs9268615", "rs9268832",
-        "rs9275224", "rs9275524", "rs9275572", "rs9275659", "rs9275686", "rs9275698", "rs9276435", "rs9357152",
-        "rs9368713", "rs9397624", "rs9405090", "rs9461799", "rs9479482", "rs972099", "rs9864529", "rs10036748",
-        "rs10046127", "rs1008953", "rs1042636", "rs1043483", "rs10484554", "rs1056198", "rs10737548", "rs1076160",
-        "rs1077492", "rs10782001", "rs10789285", "rs10794648", "rs10832027", "rs10865331", "rs10888501", "rs10889668",
-        "rs10960680", "rs11059675", "rs11065979", "rs11121129", "rs11209026", "rs11465802", "rs115324207", "rs11593576",
-        "rs116432905", "rs11687879", "rs11746443", "rs11757367", "rs11795343", "rs11961853", "rs12042824", "rs12188300",
-        "rs12191877", "rs12199223", "rs12206377", "rs1250544", "rs1250546", "rs1250566", "rs12524487", "rs12564022",
-        "rs12580100", "rs12586317", "rs1265181", "rs12720356", "rs12790634", "rs12884468", "rs13437088", "rs1400473",
-        "rs1473247", "rs147965700", "rs149912748", "rs1576", "rs1581803", "rs16895575", "rs16899661", "rs16949",
-        "rs171329", "rs17177618", "rs17185076", "rs17259252", "rs17272796", "rs17728338", "rs181359", "rs1892497",
-        "rs194675", "rs1967", "rs1975974", "rs1990760", "rs20541", "rs2066807", "rs2066808", "rs2066818", "rs2082412",
-        "rs210192", "rs2111485", "rs2145623", "rs2179920", "rs2201841", "rs2229092", "rs2230653", "rs2233278",
-        "rs2240804", "rs2256594", "rs2276405", "rs2328530", "rs2395029", "rs240993", "rs2451258", "rs2517600",
-        "rs2523710", "rs2546890", "rs2675662", "rs2688608", "rs2700979", "rs2700984", "rs27524", "rs2778031",
-        "rs280497", "rs28366363", "rs2836747", "rs2844579", "rs2844651", "rs28512356", "rs2853694", "rs2857597",
-        "rs2857602", "rs28998802", "rs29261", "rs2944542", "rs3094165", "rs3116807", "rs3129207", "rs3129269",
-        "rs3129817", "rs3129882", "rs3130192", "rs3130455", "rs3132572", "rs3174808", "rs3184504", "rs3213094",
-        "rs33980500", "rs34115245", "rs34172843", "rs34394770", "rs35960711", "rs367254", "rs3729508", "rs3730013",
-        "rs3747517", "rs3778620", "rs3782886", "rs3794765", "rs3802826", "rs397081", "rs4074995", "rs408036",
-        "rs4085613", "rs4112788", "rs41268474", "rs4148871", "rs416603", "rs4242369", "rs4245080", "rs4313034",
-        "rs4406273", "rs453779", "rs458017", "rs4649203", "rs465969", "rs4664464", "rs4713466", "rs4713614",
-        "rs4795067", "rs4845454", "rs4908343", "rs4921493", "rs492602", "rs495337", "rs5063", "rs56095701",
-        "rs57550632", "rs582757", "rs610037", "rs610604", "rs61839660", "rs61907765", "rs643177", "rs6444895",
-        "rs6457109", "rs6457702", "rs6545930", "rs6590334", "rs6596086", "rs6677595", "rs671", "rs675640", "rs6759003",
-        "rs6760912", "rs6809854", "rs6860806", "rs6870828", "rs6894567", "rs6903989", "rs694764", "rs696", "rs702873",
-        "rs72866766", "rs72896150", "rs73127695", "rs736801", "rs740884", "rs744487", "rs75105906", "rs7548511",
-        "rs76337351", "rs7637230", "rs76462670", "rs7665090", "rs7709212", "rs7720046", "rs7745603", "rs7769061",
-        "rs78233367", "rs7993214", "rs8005252", "rs8016947", "rs8128234", "rs842625", "rs842636", "rs86567", "rs892085",
-        "rs9260734", "rs9260740", "rs9266630", "rs9295676", "rs9295895", "rs9304742", "rs9348718", "rs9348841",
-        "rs9366724", "rs9368611", "rs9380326", "rs9393967", "rs9393991", "rs9394026", "rs9400467", "rs9468487",
-        "rs9504361", "rs9533962", "rs984971", "rs10155912", "rs10200159", "rs10250629", "rs1031034", "rs1042602",
-        "rs1043101", "rs10768122", "rs10774624", "rs10986311", "rs11021232", "rs11079035", "rs11203203", "rs1126809",
-        "rs1129038", "rs11966200", "rs12203592", "rs12421615", "rs12482904", "rs12771452", "rs12973771", "rs13076312",
-        "rs13136820", "rs13208776", "rs13227879", "rs1393350", "rs1417210", "rs1464510", "rs148136154", "rs1635168",
-        "rs16843742", "rs16872571", "rs17128310", "rs1805007.2", "rs2017445", "rs210124", "rs2122476", "rs2236313",
-        "rs2247314", "rs2274195", "rs229527", "rs2304206", "rs231725", "rs2456973", "rs251464", "rs2687812",
-        "rs28366353", "rs301807", "rs3127197", "rs34346645", "rs35095897", "rs35161626", "rs35860234", "rs3757247",
-        "rs3806156", "rs3814231", "rs3823355", "rs41342147", "rs4268748", "rs4308124", "rs4409785", "rs4766578",
-        "rs4807000", "rs4822024", "rs4908760", "rs561079", "rs56207241", "rs59374417", "rs6012953", "rs6059655",
-        "rs638893", "rs6510827", "rs6583331", "rs6679677", "rs6902119", "rs71508903", "rs7188793", "rs72928038",
-        "rs7758128", "rs78521699", "rs8083511", "rs8192917", "rs853308", "rs870355", "rs9271597", "rs9380143",
-        "rs9468925", "rs9611565", "rs968567", "rs982204", "rs9851967", "rs9926296"
-
-
-
-    ]
-    rsid_list2 = ["rs10833", "rs982204", "rs9851967", "rs9926296"]
-    results, errors = process_rsids(rsid_list2)
-    save_outputs(results, errors)
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"📊 실행 지표 저장: {args.metrics}")